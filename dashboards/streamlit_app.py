@@ -7,17 +7,23 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import sys
 import os
 
+try:
+    from plotly_resampler import FigureResampler
+except ImportError:
+    FigureResampler = None
+
 # Add parent directory to path to import modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.ingest_au import get_au_data
 from src.ingest_us import get_us_data
 from src.modeling.core import CreditAvailabilityIndex, PDModel, LGDModel, ECLCalculator
-from src.modeling.portfolio import create_example_au_portfolio, create_example_us_portfolio
+from src.modeling.portfolio import Portfolio, create_example_au_portfolio, create_example_us_portfolio
 from src.stress.scenarios import (TighteningScenario, SoftLandingScenario, 
                                    FundingShockScenario, CustomScenario,
                                    apply_scenario_to_portfolio)
@@ -30,16 +36,49 @@ ACCENT_COLOR = "#8FC285"
 BACKGROUND_COLOR = "#F8F9FA"
 TEXT_COLOR = "#2C3E50"
 
-# Page config
-st.set_page_config(
-    page_title="Capital Flow & Credit Risk — AU/US",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Segment table display formats: kind -> (format, divisor)
+COLUMN_FORMATS = {
+    'pct': ("{:.2%}", 1),
+    'billions': ("${:.2f}B", 1e9),
+    'millions': ("${:.1f}M", 1e6),
+    'change': ("{:+.1f}%", 1)
+}
 
-# Custom CSS
-st.markdown(f"""
+# Shared chart layout, layered on plotly_white as template='plotly_white+cfrisk'
+pio.templates['cfrisk'] = go.layout.Template(layout=dict(
+    height=400,
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+))
+CHART_TEMPLATE = 'plotly_white+cfrisk'
+# Resolved template for unvalidated dict-spec figures, which pass it through as-is
+CHART_TEMPLATE_SPEC = pio.templates[CHART_TEMPLATE].to_plotly_json()
+
+# Recommended management actions by stress severity
+HIGH_SEVERITY_ACTIONS = """
+- Tighten underwriting standards (LVR/LTI limits)
+- Increase provisions proactively
+- Review and potentially reduce exposures to high-risk segments
+- Enhance monitoring frequency for vulnerable borrowers
+- Consider portfolio rebalancing to reduce concentration risk
+"""
+MODERATE_SEVERITY_ACTIONS = """
+- Monitor credit metrics closely (monthly vs. quarterly)
+- Adjust pricing for risk (increase spreads for riskier segments)
+- Maintain elevated provisions above baseline
+- Review collateral valuations more frequently
+"""
+MILD_SEVERITY_ACTIONS = """
+- Continue normal monitoring cadence
+- No immediate action required
+- Document scenario for stress testing records
+"""
+
+# Max points sent to the browser per line trace (LTTB downsampling)
+MAX_CHART_POINTS = 1000
+
+# Page styling, emitted on every run since Streamlit drops elements a rerun
+# does not re-render
+CUSTOM_CSS = f"""
 <style>
     .main {{
         background-color: {BACKGROUND_COLOR};
@@ -65,6 +104,21 @@ st.markdown(f"""
         box-shadow: 0 2px 4px rgba(0,0,0,0.1);
         border-left: 4px solid {PRIMARY_COLOR};
     }}
+    .metric-label {{
+        font-size: 0.875rem;
+        color: {TEXT_COLOR};
+    }}
+    .metric-value {{
+        font-size: 2rem;
+        color: {TEXT_COLOR};
+    }}
+    .metric-delta {{
+        font-size: 0.875rem;
+        color: #09AB3B;
+    }}
+    .metric-delta.negative {{
+        color: #FF2B2B;
+    }}
     .stTabs [data-baseweb="tab-list"] {{
         gap: 2rem;
     }}
@@ -77,15 +131,31 @@ st.markdown(f"""
         border-bottom-color: {PRIMARY_COLOR};
     }}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Page config
+st.set_page_config(
+    page_title="Capital Flow & Credit Risk — AU/US",
+    page_icon="📊",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=3600)
 def load_data():
-    """Load AU and US data"""
-    df_au = get_au_data()
-    df_us = get_us_data()
-    return df_au, df_us
+    """Load AU and US data, with their CAI series, once per session"""
+    if 'df_au' not in st.session_state:
+        df_au = get_au_data()
+        df_us = get_us_data()
+        df_au['cai'] = compute_cai(df_au)
+        df_us['cai'] = compute_cai(df_us, rate_col='fed_funds_rate', credit_col='credit_growth')
+        st.session_state.df_au = df_au
+        st.session_state.df_us = df_us
+    # Shallow copies: tabs add derived columns without touching the session frames
+    return st.session_state.df_au.copy(deep=False), st.session_state.df_us.copy(deep=False)
 
 
 @st.cache_resource
@@ -96,62 +166,274 @@ def load_portfolios():
     return portfolio_au, portfolio_us
 
 
-def create_time_series_chart(df, columns, title, ylabel, country_color):
-    """Create time series chart"""
-    fig = go.Figure()
-    
-    for col in columns:
-        if col in df.columns:
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df[col],
-                mode='lines',
-                name=col.replace('_', ' ').title(),
-                line=dict(width=2, color=country_color if len(columns) == 1 else None)
-            ))
-    
-    fig.update_layout(
-        title=title,
-        xaxis_title="Date",
-        yaxis_title=ylabel,
-        hovermode='x unified',
-        template='plotly_white',
-        height=400,
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+@st.cache_resource(hash_funcs={Portfolio: lambda p: p.name})
+def get_portfolio_metrics(portfolio):
+    """Calculate portfolio ECL, RWA and capital once per portfolio"""
+    portfolio.calculate_ecl()
+    portfolio.calculate_rwa()
+    capital = portfolio.calculate_capital()
+    return portfolio.exposures.copy(), capital
+
+
+@st.cache_resource(hash_funcs={Portfolio: lambda p: p.name})
+def get_portfolio_arrays(portfolio):
+    """Segment columns of the calculated portfolio as NumPy arrays"""
+    exposures, _ = get_portfolio_metrics(portfolio)
+    return {
+        col: exposures[col].to_numpy()
+        for col in ('segment', 'n_loans', 'avg_pd', 'avg_lgd', 'total_ead', 'ecl_12m', 'rwa')
+    }
+
+
+@st.cache_resource
+def load_scenarios():
+    """Load the predefined stress scenarios, keyed by sidebar label"""
+    return {
+        "Monetary Tightening": TighteningScenario(),
+        "Soft Landing": SoftLandingScenario(),
+        "Funding Shock": FundingShockScenario()
+    }
+
+
+def build_custom_shocks(rate_shock, unemp_shock, housing_shock):
+    """Hashable (variable, shock) pairs for the sidebar slider values"""
+    return (
+        ('cash_rate', rate_shock),
+        ('fed_funds_rate', rate_shock),
+        ('unemployment_rate', unemp_shock),
+        ('housing_price_growth', housing_shock)
+    )
+
+
+@st.cache_resource
+def get_custom_scenario(shocks):
+    """Build a custom scenario from (variable, shock) pairs"""
+    return CustomScenario("Custom", dict(shocks))
+
+
+@st.cache_resource
+def load_models():
+    """Load credit risk model instances"""
+    return CreditAvailabilityIndex(), PDModel(), LGDModel()
+
+
+def compute_cai(df, rate_col='cash_rate', credit_col='credit_growth_housing',
+                unemp_col='unemployment_rate', gdp_col='gdp_growth'):
+    """Compute CAI series for a macro dataframe"""
+    cai_model, _, _ = load_models()
+    cai = cai_model.calculate(
+        df, rate_col=rate_col, credit_col=credit_col,
+        unemp_col=unemp_col, gdp_col=gdp_col
+    )
+    return cai.to_numpy()
+
+
+@st.cache_data(ttl=3600)
+def compute_pd(df, rate_col='cash_rate'):
+    """Compute PD series for a macro dataframe"""
+    _, pd_model, _ = load_models()
+    return pd_model.calculate_simple(df, rate_col=rate_col).to_numpy()
+
+
+@st.cache_data(ttl=3600)
+def compute_lgd(df, collateral_type='housing'):
+    """Compute LGD series for a macro dataframe"""
+    _, _, lgd_model = load_models()
+    return lgd_model.calculate_simple(df, collateral_type=collateral_type).to_numpy()
+
+
+def get_kpi_snapshot(df, columns):
+    """Latest and 12-months-prior values of KPI columns as a (2, n) array"""
+    return df.reindex(columns=columns).iloc[[-1, -12]].to_numpy()
+
+
+def get_kpi_strings(key, df, kpis):
+    """
+    Formatted (value, delta) strings for KPI columns, built once per session
+    
+    kpis: list of (column, value_fmt, delta_fmt); columns missing from df map to None
+    """
+    cache = st.session_state.setdefault('kpi_strings', {})
+    cache_key = (key, tuple(kpis))
+    if cache_key not in cache:
+        snap = get_kpi_snapshot(df, [col for col, _, _ in kpis])
+        cache[cache_key] = {
+            col: (value_fmt.format(latest), delta_fmt.format(latest - prior))
+            if col in df.columns else None
+            for (col, value_fmt, delta_fmt), latest, prior in zip(kpis, *snap)
+        }
+    return cache[cache_key]
+
+
+def format_column(values, kind):
+    """Format a numeric column for display using a COLUMN_FORMATS kind"""
+    fmt, divisor = COLUMN_FORMATS[kind]
+    return [fmt.format(x) for x in values.to_numpy() / divisor]
+
+
+@st.cache_data
+def format_report_table(df):
+    """Plain-text rendering of a report table, cached on its contents"""
+    return df.to_string(index=False)
+
+
+@st.cache_data
+def build_report_bytes(country, scenario_name, description, table_str, narratives):
+    """UTF-8 encoded text of the downloadable scenario report"""
+    parts = [
+        f"# {country} - {scenario_name} Scenario Report",
+        "",
+        "## Scenario Description",
+        description,
+        "",
+        "## Key Metrics",
+        table_str,
+        "",
+        "## Key Insights"
+    ]
+    parts.extend(f"{i}. {narrative}" for i, narrative in enumerate(narratives, 1))
+    return ("\n".join(parts) + "\n").encode("utf-8")
+
+
+def render_metric_card(label, value_str, delta_str, color=PRIMARY_COLOR):
+    """Build the HTML for one KPI metric card"""
+    negative = delta_str.startswith('-')
+    arrow = '↓' if negative else '↑'
+    delta_class = 'metric-delta negative' if negative else 'metric-delta'
+    return (
+        f'<div class="metric-card" style="border-left-color: {color}">'
+        f'<div class="metric-label">{label}</div>'
+        f'<div class="metric-value">{value_str}</div>'
+        f'<div class="{delta_class}">{arrow} {delta_str}</div>'
+        f'</div>'
+    )
+
+
+def render_metric_cards(cards):
+    """
+    Render a row of KPI metric cards, one markdown element per card
+    
+    cards: list of (label, (value_str, delta_str)); a card whose strings are
+    None is rendered empty
+    """
+    for (label, strings), slot in zip(cards, st.columns(len(cards))):
+        with slot:
+            if strings is None:
+                html = '<div class="metric-card"></div>'
+            else:
+                html = render_metric_card(label, *strings)
+            st.markdown(html, unsafe_allow_html=True)
+
+
+def create_chart_layout(title, **layout):
+    """Layout spec for a dict-spec figure using the shared chart template"""
+    return dict(title={'text': title}, template=CHART_TEMPLATE_SPEC, **layout)
+
+
+def create_line_figure(layout):
+    """Create line chart figure, downsampled with plotly-resampler if installed"""
+    # Layout is built programmatically here, so skip Plotly's schema validation
+    fig = go.Figure({'layout': layout}, _validate=False)
+    if FigureResampler is not None:
+        # Static view (no zoom callbacks), so keep legend names undecorated
+        return FigureResampler(
+            fig,
+            default_n_shown_samples=MAX_CHART_POINTS,
+            resampled_trace_prefix_suffix=('', ''),
+            show_mean_aggregation_size=False
+        )
+    return fig
+
+
+def add_line_trace(fig, x, y, **kwargs):
+    """Add a line trace, passing the full series to the resampler if enabled"""
+    if FigureResampler is not None:
+        fig.add_trace(go.Scattergl(mode='lines', **kwargs), hf_x=x, hf_y=y)
+    else:
+        fig.add_trace(go.Scattergl(x=x, y=y, mode='lines', **kwargs))
+
+
+@st.cache_data(ttl=3600)
+def run_stress(_portfolio, portfolio_name, _scenario, scenario_key, df):
+    """
+    Apply a stress scenario and build the formatted segment stress table
+    
+    Cached on (portfolio_name, scenario_key, df); the portfolio and scenario
+    objects themselves are not hashed.
+    
+    Returns: (df_stressed, totals dict, display DataFrame)
+    """
+    exposures, _ = get_portfolio_metrics(_portfolio)
+    arrays = get_portfolio_arrays(_portfolio)
+    stressed_results, df_stressed = apply_scenario_to_portfolio(_portfolio, _scenario, df)
+    
+    totals = {
+        'baseline_ecl': arrays['ecl_12m'].sum(),
+        'stressed_ecl': stressed_results['ecl_stressed'].sum(),
+        'baseline_rwa': arrays['rwa'].sum(),
+        'stressed_rwa': stressed_results['rwa_stressed'].sum()
+    }
+    
+    stress_df = stressed_results[['segment', 'ecl_stressed', 'rwa_stressed']].merge(
+        exposures[['segment', 'ecl_12m', 'rwa']],
+        on='segment'
     )
+    stress_df['ecl_change'] = (stress_df['ecl_stressed'] / stress_df['ecl_12m'] - 1) * 100
+    stress_df['rwa_change'] = (stress_df['rwa_stressed'] / stress_df['rwa'] - 1) * 100
+    
+    display_stress = stress_df[['segment', 'ecl_12m', 'ecl_stressed', 'ecl_change',
+                                'rwa', 'rwa_stressed', 'rwa_change']].copy()
+    display_stress['ecl_12m'] = format_column(display_stress['ecl_12m'], 'millions')
+    display_stress['ecl_stressed'] = format_column(display_stress['ecl_stressed'], 'millions')
+    display_stress['ecl_change'] = format_column(display_stress['ecl_change'], 'change')
+    display_stress['rwa'] = format_column(display_stress['rwa'], 'billions')
+    display_stress['rwa_stressed'] = format_column(display_stress['rwa_stressed'], 'billions')
+    display_stress['rwa_change'] = format_column(display_stress['rwa_change'], 'change')
+    
+    return df_stressed, totals, display_stress
+
+
+def create_time_series_chart(df, columns_present, title, ylabel, country_color):
+    """Create time series chart; callers pass only columns present in df"""
+    fig = create_line_figure(create_chart_layout(
+        title,
+        xaxis={'title': {'text': "Date"}},
+        yaxis={'title': {'text': ylabel}},
+        hovermode='x unified',
+        showlegend=True
+    ))
+    
+    dates = df.index.to_numpy()
+    line_color = country_color if len(columns_present) == 1 else None
+    for col in columns_present:
+        add_line_trace(
+            fig, dates, df[col].to_numpy(),
+            name=col.replace('_', ' ').title(),
+            line=dict(width=2, color=line_color)
+        )
     
     return fig
 
 
 def create_comparison_chart(df_au, df_us, var_au, var_us, title):
     """Create comparison chart for AU vs US"""
-    fig = go.Figure()
+    fig = create_line_figure(create_chart_layout(
+        title,
+        xaxis={'title': {'text': "Date"}},
+        hovermode='x unified',
+        showlegend=True
+    ))
     
-    fig.add_trace(go.Scatter(
-        x=df_au.index,
-        y=df_au[var_au],
-        mode='lines',
+    add_line_trace(
+        fig, df_au.index, df_au[var_au],
         name='Australia',
         line=dict(width=3, color=PRIMARY_COLOR)
-    ))
+    )
     
-    fig.add_trace(go.Scatter(
-        x=df_us.index,
-        y=df_us[var_us],
-        mode='lines',
+    add_line_trace(
+        fig, df_us.index, df_us[var_us],
         name='United States',
         line=dict(width=3, color='#E74C3C')
-    ))
-    
-    fig.update_layout(
-        title=title,
-        xaxis_title="Date",
-        hovermode='x unified',
-        template='plotly_white',
-        height=400,
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     
     return fig
@@ -159,60 +441,399 @@ def create_comparison_chart(df_au, df_us, var_au, var_us, title):
 
 def create_portfolio_breakdown(portfolio, color):
     """Create portfolio segment breakdown chart"""
-    if 'ecl_12m' not in portfolio.exposures.columns:
-        portfolio.calculate_ecl()
-    
-    fig = go.Figure(data=[
-        go.Bar(
-            x=portfolio.exposures['segment'],
-            y=portfolio.exposures['total_ead'] / 1e9,
-            name='Exposure (EAD)',
-            marker_color=color,
-            text=portfolio.exposures['total_ead'] / 1e9,
-            texttemplate='$%{text:.1f}B',
-            textposition='outside'
-        )
-    ])
-    
-    fig.update_layout(
-        title=f"{portfolio.name} - Exposure by Segment",
-        xaxis_title="Segment",
-        yaxis_title="Exposure ($ Billions)",
-        template='plotly_white',
-        height=400,
-        showlegend=False
-    )
+    arrays = get_portfolio_arrays(portfolio)
+    ead_bn = arrays['total_ead'] / 1e9
     
-    return fig
+    return go.Figure({
+        'data': [{
+            'type': 'bar',
+            'x': arrays['segment'],
+            'y': ead_bn,
+            'name': 'Exposure (EAD)',
+            'marker': {'color': color},
+            'text': ead_bn,
+            'texttemplate': '$%{text:.1f}B',
+            'textposition': 'outside'
+        }],
+        'layout': create_chart_layout(
+            f"{portfolio.name} - Exposure by Segment",
+            xaxis={'title': {'text': "Segment"}},
+            yaxis={'title': {'text': "Exposure ($ Billions)"}},
+            showlegend=False
+        )
+    }, _validate=False)
 
 
-def create_stress_comparison(baseline_ecl, stressed_ecl, scenario_name, color):
-    """Create stress comparison chart"""
+def create_stress_comparison(baseline, stressed, scenario_name, color,
+                             metric_name="Expected Credit Loss", metric_abbr="ECL",
+                             value_format=".2f"):
+    """Create baseline vs stressed bar chart for a $ metric (shown in billions)"""
     categories = ['Baseline', scenario_name]
-    values = [baseline_ecl / 1e9, stressed_ecl / 1e9]
-    
-    fig = go.Figure(data=[
-        go.Bar(
-            x=categories,
-            y=values,
-            marker_color=[color, '#E74C3C'],
-            text=values,
-            texttemplate='$%{text:.2f}B',
-            textposition='outside'
+    values = [baseline / 1e9, stressed / 1e9]
+    
+    increase_pct = (stressed / baseline - 1) * 100
+    
+    return go.Figure({
+        'data': [{
+            'type': 'bar',
+            'x': categories,
+            'y': values,
+            'marker': {'color': [color, '#E74C3C']},
+            'text': values,
+            'texttemplate': f'$%{{text:{value_format}}}B',
+            'textposition': 'outside'
+        }],
+        'layout': create_chart_layout(
+            f"{metric_name} Comparison<br><sub>Increase: +{increase_pct:.1f}%</sub>",
+            yaxis={'title': {'text': f"{metric_abbr} ($ Billions)"}},
+            showlegend=False
         )
-    ])
+    }, _validate=False)
+
+
+@st.fragment
+def render_macro_tab(df, country, country_color, rate_col, credit_col):
+    """Render macro trend charts"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig = create_time_series_chart(
+            df, [rate_col],
+            f'{country} Policy Rate',
+            'Rate (%)',
+            country_color
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        fig = create_time_series_chart(
+            df, ['unemployment_rate'],
+            f'{country} Unemployment Rate',
+            'Unemployment (%)',
+            country_color
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    col3, col4 = st.columns(2)
+    
+    with col3:
+        if credit_col in df.columns:
+            fig = create_time_series_chart(
+                df, [credit_col],
+                f'{country} Credit Growth',
+                'Growth (%)',
+                country_color
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
+    with col4:
+        if 'gdp_growth' in df.columns:
+            fig = create_time_series_chart(
+                df, ['gdp_growth'],
+                f'{country} GDP Growth',
+                'Growth (%)',
+                country_color
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def render_credit_risk_tab(df, country, country_color, rate_col, credit_col):
+    """Render CAI and PD charts"""
+    # Calculate credit risk metrics (CAI is attached at load time)
+    df['pd'] = compute_pd(df, rate_col=rate_col)
+    
+    if country == "Australia" and 'housing_price_growth' in df.columns:
+        df['lgd'] = compute_lgd(df, collateral_type='housing')
+    else:
+        df['lgd'] = compute_lgd(df, collateral_type='unsecured')  # Fixed 45% LGD
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig = create_time_series_chart(
+            df, ['cai'],
+            'Credit Availability Index',
+            'CAI (0-100)',
+            country_color
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        fig = create_time_series_chart(
+            df, ['pd'],
+            'Probability of Default (PD)',
+            'PD',
+            country_color
+        )
+        # Format as percentage
+        fig.update_yaxes(tickformat=".1%")
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def render_portfolio_summary(portfolio, color, label):
+    """Render stacked headline metrics and breakdown for one portfolio"""
+    st.subheader(label)
+    _, capital = get_portfolio_metrics(portfolio)
+    arrays = get_portfolio_arrays(portfolio)
+    
+    st.metric("Total Exposure", f"${arrays['total_ead'].sum() / 1e9:.1f}B")
+    st.metric("Total ECL (12m)", f"${arrays['ecl_12m'].sum() / 1e9:.2f}B")
+    st.metric("Total RWA", f"${arrays['rwa'].sum() / 1e9:.1f}B")
+    st.metric("CET1 Required", f"${capital['cet1_required'] / 1e9:.2f}B")
+    
+    fig = create_portfolio_breakdown(portfolio, color)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def render_portfolio_tab(portfolio, country, country_color):
+    """Render portfolio overview and segment table"""
+    st.subheader(f"{country} Portfolio Overview")
+    
+    exposures, capital = get_portfolio_metrics(portfolio)
+    arrays = get_portfolio_arrays(portfolio)
+    
+    # Summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            "Total Exposure (EAD)",
+            f"${arrays['total_ead'].sum() / 1e9:.1f}B"
+        )
+    
+    with col2:
+        st.metric(
+            "Total ECL (12-month)",
+            f"${arrays['ecl_12m'].sum() / 1e9:.2f}B"
+        )
+    
+    with col3:
+        st.metric(
+            "Total RWA",
+            f"${arrays['rwa'].sum() / 1e9:.1f}B"
+        )
+    
+    with col4:
+        st.metric(
+            "CET1 Capital Required",
+            f"${capital['cet1_required'] / 1e9:.2f}B"
+        )
+    
+    st.markdown("---")
+    
+    # Portfolio breakdown
+    fig = create_portfolio_breakdown(portfolio, country_color)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Detailed segment table
+    st.subheader("Segment Details")
+    display_df = exposures[['segment', 'n_loans', 'avg_pd', 'avg_lgd', 
+                                     'total_ead', 'ecl_12m', 'rwa']].copy()
+    display_df['avg_pd'] = format_column(display_df['avg_pd'], 'pct')
+    display_df['avg_lgd'] = format_column(display_df['avg_lgd'], 'pct')
+    display_df['total_ead'] = format_column(display_df['total_ead'], 'billions')
+    display_df['ecl_12m'] = format_column(display_df['ecl_12m'], 'millions')
+    display_df['rwa'] = format_column(display_df['rwa'], 'billions')
+    
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def render_stress_tab(df, portfolio, scenario, scenario_type, scenario_key,
+                      country_color, kpi_cols, snap, credit_col):
+    """Render stress scenario impact"""
+    st.subheader(f"⚠️ Stress Testing: {scenario_type}")
+    
+    if scenario:
+        st.info(f"**Scenario:** {scenario.description}")
+        
+        # Apply scenario
+        df_stressed, totals, display_stress = run_stress(
+            portfolio, portfolio.name, scenario, scenario_key, df
+        )
+        
+        # Show stressed macro variables
+        stress_last = get_kpi_snapshot(df_stressed, kpi_cols)[0]
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            base_rate = snap[0, 0]
+            stress_rate = stress_last[0]
+            st.metric(
+                "Policy Rate",
+                f"{stress_rate:.2f}%",
+                f"{stress_rate - base_rate:+.2f}pp"
+            )
+        
+        with col2:
+            base_unemp = snap[0, 1]
+            stress_unemp = stress_last[1]
+            st.metric(
+                "Unemployment",
+                f"{stress_unemp:.1f}%",
+                f"{stress_unemp - base_unemp:+.1f}pp"
+            )
+        
+        with col3:
+            if credit_col in df_stressed.columns:
+                base_credit = snap[0, 2]
+                stress_credit = stress_last[2]
+                st.metric(
+                    "Credit Growth",
+                    f"{stress_credit:.1f}%",
+                    f"{stress_credit - base_credit:+.1f}pp"
+                )
+        
+        st.markdown("---")
+        
+        # Stressed portfolio metrics
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = create_stress_comparison(
+                totals['baseline_ecl'], totals['stressed_ecl'],
+                scenario_type, country_color
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            fig = create_stress_comparison(
+                totals['baseline_rwa'], totals['stressed_rwa'],
+                scenario_type, country_color,
+                metric_name="Risk-Weighted Assets", metric_abbr="RWA",
+                value_format=".1f"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Segment-level stress
+        st.subheader("Stressed Results by Segment")
+        st.dataframe(display_stress, use_container_width=True, hide_index=True)
     
-    increase_pct = (stressed_ecl / baseline_ecl - 1) * 100
+    else:
+        st.info("Select a stress scenario from the sidebar to see results")
+
+
+def render_actions(report, country, comparison_df):
+    """Render severity-based management actions and the report download"""
+    st.markdown("#### 🎯 Recommended Actions")
+    
+    ecl_change = report.metrics.get('ECL', {}).get('delta_pct', 0)
+    
+    if abs(ecl_change) > 40:
+        st.warning("**High Severity** - Immediate action required")
+        st.markdown(HIGH_SEVERITY_ACTIONS)
+    elif abs(ecl_change) > 20:
+        st.info("**Moderate Severity** - Enhanced monitoring")
+        st.markdown(MODERATE_SEVERITY_ACTIONS)
+    else:
+        st.success("**Mild Impact** - Business as usual with elevated vigilance")
+        st.markdown(MILD_SEVERITY_ACTIONS)
+    
+    # Download report
+    st.markdown("---")
+    st.markdown("#### 📥 Export Report")
     
-    fig.update_layout(
-        title=f"Expected Credit Loss Comparison<br><sub>Increase: +{increase_pct:.1f}%</sub>",
-        yaxis_title="ECL ($ Billions)",
-        template='plotly_white',
-        height=400,
-        showlegend=False
+    report_bytes = build_report_bytes(
+        country, report.scenario_name, report.description,
+        format_report_table(comparison_df), tuple(report.narratives)
     )
     
-    return fig
+    # Downloading needs no rerun; the file is already built
+    st.download_button(
+        label="Download Scenario Report (TXT)",
+        data=report_bytes,
+        file_name=f"{country}_{report.scenario_name.replace(' ', '_')}_report.txt",
+        mime="text/plain",
+        on_click="ignore"
+    )
+
+
+@st.fragment
+def render_insights_tab(df, portfolio, scenario, country, rate_col, credit_col):
+    """Render scenario insights, actions and report export"""
+    st.subheader("📊 Scenario Insights & Projections")
+    
+    st.markdown("""
+    This tab provides professional risk report narratives and scenario comparisons.
+    Select a scenario from the sidebar to see detailed insights.
+    """)
+    
+    if scenario:
+        # Calculate baseline metrics
+        arrays = get_portfolio_arrays(portfolio)
+        
+        baseline_metrics = {
+            'ecl': arrays['ecl_12m'].sum(),
+            'rwa': arrays['rwa'].sum(),
+            'cet1': 11.2,
+            'cai': df['cai'].iloc[-1]
+        }
+        
+        # Generate scenario insights
+        report = generate_scenario_insights(
+            portfolio, df, scenario, baseline_metrics
+        )
+        
+        # Display scenario summary
+        st.markdown(f"### Scenario: {report.scenario_name}")
+        st.info(f"**Description:** {report.description}")
+        
+        # Key metrics comparison
+        st.markdown("#### 📈 Key Metrics Comparison")
+        comparison_df = report.get_comparison_table()
+        
+        # Style the dataframe
+        st.dataframe(
+            comparison_df,
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Narratives
+        st.markdown("#### 💡 Key Insights")
+        for i, narrative in enumerate(report.narratives, 1):
+            st.markdown(f"**{i}.** {narrative}")
+        
+        # Segment deep-dive
+        st.markdown("#### 🏦 Segment Analysis")
+        
+        segment_metrics = []
+        for metric_name, values in report.metrics.items():
+            if 'ECL' in metric_name and metric_name != 'ECL':
+                segment_metrics.append({
+                    'Segment': metric_name.replace(' ECL', ''),
+                    'Baseline ECL': f"${values['baseline']:.1f}{values['unit']}",
+                    'Stressed ECL': f"${values['scenario']:.1f}{values['unit']}",
+                    'Change': f"{values['delta_pct']:+.1f}%"
+                })
+        
+        if segment_metrics:
+            segment_df = pd.DataFrame(segment_metrics)
+            st.dataframe(segment_df, use_container_width=True, hide_index=True)
+        
+        # Management actions and export
+        render_actions(report, country, comparison_df)
+    
+    else:
+        st.info("👈 Select a stress scenario from the sidebar to generate insights")
+        
+        # Show example insights structure
+        st.markdown("#### Example Insights Structure")
+        st.markdown("""
+        When you select a scenario, you'll see:
+        
+        1. **Metrics Comparison Table** - Baseline vs. Stressed for CAI, PD, LGD, ECL, RWA, CET1
+        2. **Narrative Insights** - Automatically generated explanations of:
+           - Credit availability changes (CAI)
+           - Loss drivers (PD vs. LGD contribution)
+           - Capital impact (CET1 compression)
+           - Liquidity implications (LCR proxy)
+        3. **Segment Analysis** - Deep-dive by portfolio segment
+        4. **Recommended Actions** - Risk management responses based on severity
+        5. **Exportable Report** - Download as text file for documentation
+        """)
 
 
 def main():
@@ -246,69 +867,38 @@ def main():
     )
     
     # Custom scenario parameters
+    scenario_key = scenario_type
     if scenario_type == "Custom":
         st.sidebar.markdown("#### Custom Scenario Parameters")
         rate_shock = st.sidebar.slider("Rate Shock (bps)", -200, 400, 0, 25) / 100
         unemp_shock = st.sidebar.slider("Unemployment Shock (pp)", -2.0, 5.0, 0.0, 0.5)
         housing_shock = st.sidebar.slider("Housing Price Shock (%)", -30, 20, 0, 5)
+        shocks = build_custom_shocks(rate_shock, unemp_shock, housing_shock)
+        scenario_key = (scenario_type, shocks)
         
-        scenario = CustomScenario("Custom", {
-            'cash_rate': rate_shock,
-            'fed_funds_rate': rate_shock,
-            'unemployment_rate': unemp_shock,
-            'housing_price_growth': housing_shock
-        })
-    elif scenario_type == "Monetary Tightening":
-        scenario = TighteningScenario()
-    elif scenario_type == "Soft Landing":
-        scenario = SoftLandingScenario()
-    elif scenario_type == "Funding Shock":
-        scenario = FundingShockScenario()
+        scenario = get_custom_scenario(shocks)
     else:
-        scenario = None
+        scenario = load_scenarios().get(scenario_type)
     
     # Main content
     if country == "Compare Both":
         st.header("🌏 Australia vs United States Comparison")
         
         # Key metrics comparison
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric(
-                "AU Cash Rate",
-                f"{df_au['cash_rate'].iloc[-1]:.2f}%",
-                f"{df_au['cash_rate'].iloc[-1] - df_au['cash_rate'].iloc[-12]:.2f}pp"
-            )
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric(
-                "US Fed Funds",
-                f"{df_us['fed_funds_rate'].iloc[-1]:.2f}%",
-                f"{df_us['fed_funds_rate'].iloc[-1] - df_us['fed_funds_rate'].iloc[-12]:.2f}pp"
-            )
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric(
-                "AU Unemployment",
-                f"{df_au['unemployment_rate'].iloc[-1]:.1f}%",
-                f"{df_au['unemployment_rate'].iloc[-1] - df_au['unemployment_rate'].iloc[-12]:.1f}pp"
-            )
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col4:
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric(
-                "US Unemployment",
-                f"{df_us['unemployment_rate'].iloc[-1]:.1f}%",
-                f"{df_us['unemployment_rate'].iloc[-1] - df_us['unemployment_rate'].iloc[-12]:.1f}pp"
-            )
-            st.markdown('</div>', unsafe_allow_html=True)
+        kpi_au = get_kpi_strings('au', df_au, [
+            ('cash_rate', "{:.2f}%", "{:.2f}pp"),
+            ('unemployment_rate', "{:.1f}%", "{:.1f}pp")
+        ])
+        kpi_us = get_kpi_strings('us', df_us, [
+            ('fed_funds_rate', "{:.2f}%", "{:.2f}pp"),
+            ('unemployment_rate', "{:.1f}%", "{:.1f}pp")
+        ])
+        render_metric_cards([
+            ("AU Cash Rate", kpi_au['cash_rate']),
+            ("US Fed Funds", kpi_us['fed_funds_rate']),
+            ("AU Unemployment", kpi_au['unemployment_rate']),
+            ("US Unemployment", kpi_us['unemployment_rate'])
+        ])
         
         st.markdown("---")
         
@@ -355,17 +945,6 @@ def main():
                     st.plotly_chart(fig, use_container_width=True)
         
         with tab2:
-            # Calculate CAI for both countries
-            cai_model = CreditAvailabilityIndex()
-            df_au['cai'] = cai_model.calculate(df_au)
-            df_us['cai'] = cai_model.calculate(
-                df_us, 
-                rate_col='fed_funds_rate',
-                credit_col='credit_growth',
-                unemp_col='unemployment_rate',
-                gdp_col='gdp_growth'
-            )
-            
             col1, col2 = st.columns(2)
             
             with col1:
@@ -387,35 +966,13 @@ def main():
                 st.plotly_chart(fig, use_container_width=True)
         
         with tab3:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("🇦🇺 Australian Portfolio")
-                portfolio_au.calculate_ecl()
-                portfolio_au.calculate_rwa()
-                capital_au = portfolio_au.calculate_capital()
-                
-                st.metric("Total Exposure", f"${portfolio_au.exposures['total_ead'].sum() / 1e9:.1f}B")
-                st.metric("Total ECL (12m)", f"${portfolio_au.exposures['ecl_12m'].sum() / 1e9:.2f}B")
-                st.metric("Total RWA", f"${portfolio_au.exposures['rwa'].sum() / 1e9:.1f}B")
-                st.metric("CET1 Required", f"${capital_au['cet1_required'] / 1e9:.2f}B")
-                
-                fig = create_portfolio_breakdown(portfolio_au, PRIMARY_COLOR)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                st.subheader("🇺🇸 US Portfolio")
-                portfolio_us.calculate_ecl()
-                portfolio_us.calculate_rwa()
-                capital_us = portfolio_us.calculate_capital()
-                
-                st.metric("Total Exposure", f"${portfolio_us.exposures['total_ead'].sum() / 1e9:.1f}B")
-                st.metric("Total ECL (12m)", f"${portfolio_us.exposures['ecl_12m'].sum() / 1e9:.2f}B")
-                st.metric("Total RWA", f"${portfolio_us.exposures['rwa'].sum() / 1e9:.1f}B")
-                st.metric("CET1 Required", f"${capital_us['cet1_required'] / 1e9:.2f}B")
-                
-                fig = create_portfolio_breakdown(portfolio_us, '#E74C3C')
-                st.plotly_chart(fig, use_container_width=True)
+            portfolios = [
+                (portfolio_au, PRIMARY_COLOR, "🇦🇺 Australian Portfolio"),
+                (portfolio_us, '#E74C3C', "🇺🇸 US Portfolio")
+            ]
+            for (port, color, label), col in zip(portfolios, st.columns(2)):
+                with col:
+                    render_portfolio_summary(port, color, label)
     
     else:
         # Single country view
@@ -437,45 +994,20 @@ def main():
         st.header(f"{country_emoji} {country} Credit Risk Analysis")
         
         # Key metrics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric(
-                "Policy Rate",
-                f"{df[rate_col].iloc[-1]:.2f}%",
-                f"{df[rate_col].iloc[-1] - df[rate_col].iloc[-12]:.2f}pp"
-            )
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric(
-                "Unemployment",
-                f"{df['unemployment_rate'].iloc[-1]:.1f}%",
-                f"{df['unemployment_rate'].iloc[-1] - df['unemployment_rate'].iloc[-12]:.1f}pp"
-            )
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            if credit_col in df.columns:
-                st.metric(
-                    "Credit Growth",
-                    f"{df[credit_col].iloc[-1]:.1f}%",
-                    f"{df[credit_col].iloc[-1] - df[credit_col].iloc[-12]:.1f}pp"
-                )
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col4:
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            if 'default_rate_proxy' in df.columns:
-                st.metric(
-                    "Default Rate Proxy",
-                    f"{df['default_rate_proxy'].iloc[-1]:.2f}%",
-                    f"{df['default_rate_proxy'].iloc[-1] - df['default_rate_proxy'].iloc[-12]:.2f}pp"
-                )
-            st.markdown('</div>', unsafe_allow_html=True)
+        kpi_cols = [rate_col, 'unemployment_rate', credit_col, 'default_rate_proxy']
+        snap = get_kpi_snapshot(df, kpi_cols)
+        kpi = get_kpi_strings(country, df, [
+            (rate_col, "{:.2f}%", "{:.2f}pp"),
+            ('unemployment_rate', "{:.1f}%", "{:.1f}pp"),
+            (credit_col, "{:.1f}%", "{:.1f}pp"),
+            ('default_rate_proxy', "{:.2f}%", "{:.2f}pp")
+        ])
+        render_metric_cards([
+            ("Policy Rate", kpi[rate_col]),
+            ("Unemployment", kpi['unemployment_rate']),
+            ("Credit Growth", kpi[credit_col]),
+            ("Default Rate Proxy", kpi['default_rate_proxy'])
+        ])
         
         st.markdown("---")
         
@@ -489,389 +1021,22 @@ def main():
         ])
         
         with tab1:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                fig = create_time_series_chart(
-                    df, [rate_col],
-                    f'{country} Policy Rate',
-                    'Rate (%)',
-                    country_color
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                fig = create_time_series_chart(
-                    df, ['unemployment_rate'],
-                    f'{country} Unemployment Rate',
-                    'Unemployment (%)',
-                    country_color
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            col3, col4 = st.columns(2)
-            
-            with col3:
-                if credit_col in df.columns:
-                    fig = create_time_series_chart(
-                        df, [credit_col],
-                        f'{country} Credit Growth',
-                        'Growth (%)',
-                        country_color
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-            
-            with col4:
-                if 'gdp_growth' in df.columns:
-                    fig = create_time_series_chart(
-                        df, ['gdp_growth'],
-                        f'{country} GDP Growth',
-                        'Growth (%)',
-                        country_color
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+            render_macro_tab(df, country, country_color, rate_col, credit_col)
         
         with tab2:
-            # Calculate credit risk metrics
-            cai_model = CreditAvailabilityIndex()
-            pd_model = PDModel()
-            lgd_model = LGDModel()
-            
-            df['cai'] = cai_model.calculate(
-                df, rate_col=rate_col, credit_col=credit_col
-            )
-            df['pd'] = pd_model.calculate_simple(
-                df, rate_col=rate_col
-            )
-            
-            if country == "Australia" and 'housing_price_growth' in df.columns:
-                df['lgd'] = lgd_model.calculate_simple(df, collateral_type='housing')
-            else:
-                df['lgd'] = 0.45  # Fixed LGD for simplicity
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                fig = create_time_series_chart(
-                    df, ['cai'],
-                    'Credit Availability Index',
-                    'CAI (0-100)',
-                    country_color
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                fig = create_time_series_chart(
-                    df, ['pd'],
-                    'Probability of Default (PD)',
-                    'PD',
-                    country_color
-                )
-                # Format as percentage
-                fig.update_yaxes(tickformat=".1%")
-                st.plotly_chart(fig, use_container_width=True)
+            render_credit_risk_tab(df, country, country_color, rate_col, credit_col)
         
         with tab3:
-            st.subheader(f"{country} Portfolio Overview")
-            
-            portfolio.calculate_ecl()
-            portfolio.calculate_rwa()
-            capital = portfolio.calculate_capital()
-            
-            # Summary metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric(
-                    "Total Exposure (EAD)",
-                    f"${portfolio.exposures['total_ead'].sum() / 1e9:.1f}B"
-                )
-            
-            with col2:
-                st.metric(
-                    "Total ECL (12-month)",
-                    f"${portfolio.exposures['ecl_12m'].sum() / 1e9:.2f}B"
-                )
-            
-            with col3:
-                st.metric(
-                    "Total RWA",
-                    f"${portfolio.exposures['rwa'].sum() / 1e9:.1f}B"
-                )
-            
-            with col4:
-                st.metric(
-                    "CET1 Capital Required",
-                    f"${capital['cet1_required'] / 1e9:.2f}B"
-                )
-            
-            st.markdown("---")
-            
-            # Portfolio breakdown
-            fig = create_portfolio_breakdown(portfolio, country_color)
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Detailed segment table
-            st.subheader("Segment Details")
-            display_df = portfolio.exposures[['segment', 'n_loans', 'avg_pd', 'avg_lgd', 
-                                             'total_ead', 'ecl_12m', 'rwa']].copy()
-            display_df['avg_pd'] = display_df['avg_pd'].apply(lambda x: f"{x:.2%}")
-            display_df['avg_lgd'] = display_df['avg_lgd'].apply(lambda x: f"{x:.2%}")
-            display_df['total_ead'] = display_df['total_ead'].apply(lambda x: f"${x/1e9:.2f}B")
-            display_df['ecl_12m'] = display_df['ecl_12m'].apply(lambda x: f"${x/1e6:.1f}M")
-            display_df['rwa'] = display_df['rwa'].apply(lambda x: f"${x/1e9:.2f}B")
-            
-            st.dataframe(display_df, use_container_width=True, hide_index=True)
+            render_portfolio_tab(portfolio, country, country_color)
         
         with tab4:
-            st.subheader(f"⚠️ Stress Testing: {scenario_type}")
-            
-            if scenario:
-                st.info(f"**Scenario:** {scenario.description}")
-                
-                # Apply scenario
-                stressed_results, df_stressed = apply_scenario_to_portfolio(
-                    portfolio, scenario, df
-                )
-                
-                # Show stressed macro variables
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    base_rate = df[rate_col].iloc[-1]
-                    stress_rate = df_stressed[rate_col].iloc[-1]
-                    st.metric(
-                        "Policy Rate",
-                        f"{stress_rate:.2f}%",
-                        f"{stress_rate - base_rate:+.2f}pp"
-                    )
-                
-                with col2:
-                    base_unemp = df['unemployment_rate'].iloc[-1]
-                    stress_unemp = df_stressed['unemployment_rate'].iloc[-1]
-                    st.metric(
-                        "Unemployment",
-                        f"{stress_unemp:.1f}%",
-                        f"{stress_unemp - base_unemp:+.1f}pp"
-                    )
-                
-                with col3:
-                    if credit_col in df_stressed.columns:
-                        base_credit = df[credit_col].iloc[-1]
-                        stress_credit = df_stressed[credit_col].iloc[-1]
-                        st.metric(
-                            "Credit Growth",
-                            f"{stress_credit:.1f}%",
-                            f"{stress_credit - base_credit:+.1f}pp"
-                        )
-                
-                st.markdown("---")
-                
-                # Stressed portfolio metrics
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    baseline_ecl = portfolio.exposures['ecl_12m'].sum()
-                    stressed_ecl = stressed_results['ecl_stressed'].sum()
-                    
-                    fig = create_stress_comparison(
-                        baseline_ecl, stressed_ecl,
-                        scenario_type, country_color
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                with col2:
-                    baseline_rwa = portfolio.exposures['rwa'].sum()
-                    stressed_rwa = stressed_results['rwa_stressed'].sum()
-                    
-                    categories = ['Baseline', scenario_type]
-                    values = [baseline_rwa / 1e9, stressed_rwa / 1e9]
-                    
-                    fig = go.Figure(data=[
-                        go.Bar(
-                            x=categories,
-                            y=values,
-                            marker_color=[country_color, '#E74C3C'],
-                            text=values,
-                            texttemplate='$%{text:.1f}B',
-                            textposition='outside'
-                        )
-                    ])
-                    
-                    increase_pct = (stressed_rwa / baseline_rwa - 1) * 100
-                    
-                    fig.update_layout(
-                        title=f"Risk-Weighted Assets Comparison<br><sub>Increase: +{increase_pct:.1f}%</sub>",
-                        yaxis_title="RWA ($ Billions)",
-                        template='plotly_white',
-                        height=400,
-                        showlegend=False
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Segment-level stress
-                st.subheader("Stressed Results by Segment")
-                stress_df = stressed_results[['segment', 'ecl_stressed', 'rwa_stressed']].copy()
-                stress_df = stress_df.merge(
-                    portfolio.exposures[['segment', 'ecl_12m', 'rwa']],
-                    on='segment'
-                )
-                stress_df['ecl_change'] = (stress_df['ecl_stressed'] / stress_df['ecl_12m'] - 1) * 100
-                stress_df['rwa_change'] = (stress_df['rwa_stressed'] / stress_df['rwa'] - 1) * 100
-                
-                display_stress = stress_df[['segment', 'ecl_12m', 'ecl_stressed', 'ecl_change',
-                                           'rwa', 'rwa_stressed', 'rwa_change']].copy()
-                display_stress['ecl_12m'] = display_stress['ecl_12m'].apply(lambda x: f"${x/1e6:.1f}M")
-                display_stress['ecl_stressed'] = display_stress['ecl_stressed'].apply(lambda x: f"${x/1e6:.1f}M")
-                display_stress['ecl_change'] = display_stress['ecl_change'].apply(lambda x: f"{x:+.1f}%")
-                display_stress['rwa'] = display_stress['rwa'].apply(lambda x: f"${x/1e9:.2f}B")
-                display_stress['rwa_stressed'] = display_stress['rwa_stressed'].apply(lambda x: f"${x/1e9:.2f}B")
-                display_stress['rwa_change'] = display_stress['rwa_change'].apply(lambda x: f"{x:+.1f}%")
-                
-                st.dataframe(display_stress, use_container_width=True, hide_index=True)
-            
-            else:
-                st.info("Select a stress scenario from the sidebar to see results")
+            render_stress_tab(
+                df, portfolio, scenario, scenario_type, scenario_key,
+                country_color, kpi_cols, snap, credit_col
+            )
         
         with tab5:
-            st.subheader("📊 Scenario Insights & Projections")
-            
-            st.markdown("""
-            This tab provides professional risk report narratives and scenario comparisons.
-            Select a scenario from the sidebar to see detailed insights.
-            """)
-            
-            if scenario:
-                # Calculate baseline metrics
-                portfolio.calculate_ecl()
-                portfolio.calculate_rwa()
-                capital = portfolio.calculate_capital()
-                
-                # Calculate CAI
-                cai_model = CreditAvailabilityIndex()
-                df['cai'] = cai_model.calculate(df, rate_col=rate_col, credit_col=credit_col)
-                
-                baseline_metrics = {
-                    'ecl': portfolio.exposures['ecl_12m'].sum(),
-                    'rwa': portfolio.exposures['rwa'].sum(),
-                    'cet1': 11.2,
-                    'cai': df['cai'].iloc[-1]
-                }
-                
-                # Generate scenario insights
-                report = generate_scenario_insights(
-                    portfolio, df, scenario, baseline_metrics
-                )
-                
-                # Display scenario summary
-                st.markdown(f"### Scenario: {report.scenario_name}")
-                st.info(f"**Description:** {report.description}")
-                
-                # Key metrics comparison
-                st.markdown("#### 📈 Key Metrics Comparison")
-                comparison_df = report.get_comparison_table()
-                
-                # Style the dataframe
-                st.dataframe(
-                    comparison_df,
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                # Narratives
-                st.markdown("#### 💡 Key Insights")
-                for i, narrative in enumerate(report.narratives, 1):
-                    st.markdown(f"**{i}.** {narrative}")
-                
-                # Segment deep-dive
-                st.markdown("#### 🏦 Segment Analysis")
-                
-                segment_metrics = []
-                for metric_name, values in report.metrics.items():
-                    if 'ECL' in metric_name and metric_name != 'ECL':
-                        segment_metrics.append({
-                            'Segment': metric_name.replace(' ECL', ''),
-                            'Baseline ECL': f"${values['baseline']:.1f}{values['unit']}",
-                            'Stressed ECL': f"${values['scenario']:.1f}{values['unit']}",
-                            'Change': f"{values['delta_pct']:+.1f}%"
-                        })
-                
-                if segment_metrics:
-                    segment_df = pd.DataFrame(segment_metrics)
-                    st.dataframe(segment_df, use_container_width=True, hide_index=True)
-                
-                # Management actions
-                st.markdown("#### 🎯 Recommended Actions")
-                
-                ecl_change = report.metrics.get('ECL', {}).get('delta_pct', 0)
-                
-                if abs(ecl_change) > 40:
-                    st.warning("**High Severity** - Immediate action required")
-                    st.markdown("""
-                    - Tighten underwriting standards (LVR/LTI limits)
-                    - Increase provisions proactively
-                    - Review and potentially reduce exposures to high-risk segments
-                    - Enhance monitoring frequency for vulnerable borrowers
-                    - Consider portfolio rebalancing to reduce concentration risk
-                    """)
-                elif abs(ecl_change) > 20:
-                    st.info("**Moderate Severity** - Enhanced monitoring")
-                    st.markdown("""
-                    - Monitor credit metrics closely (monthly vs. quarterly)
-                    - Adjust pricing for risk (increase spreads for riskier segments)
-                    - Maintain elevated provisions above baseline
-                    - Review collateral valuations more frequently
-                    """)
-                else:
-                    st.success("**Mild Impact** - Business as usual with elevated vigilance")
-                    st.markdown("""
-                    - Continue normal monitoring cadence
-                    - No immediate action required
-                    - Document scenario for stress testing records
-                    """)
-                
-                # Download report
-                st.markdown("---")
-                st.markdown("#### 📥 Export Report")
-                
-                report_text = f"""# {country} - {report.scenario_name} Scenario Report
-
-## Scenario Description
-{report.description}
-
-## Key Metrics
-{comparison_df.to_string(index=False)}
-
-## Key Insights
-"""
-                for i, narrative in enumerate(report.narratives, 1):
-                    report_text += f"{i}. {narrative}\n"
-                
-                st.download_button(
-                    label="Download Scenario Report (TXT)",
-                    data=report_text,
-                    file_name=f"{country}_{report.scenario_name.replace(' ', '_')}_report.txt",
-                    mime="text/plain"
-                )
-            
-            else:
-                st.info("👈 Select a stress scenario from the sidebar to generate insights")
-                
-                # Show example insights structure
-                st.markdown("#### Example Insights Structure")
-                st.markdown("""
-                When you select a scenario, you'll see:
-                
-                1. **Metrics Comparison Table** - Baseline vs. Stressed for CAI, PD, LGD, ECL, RWA, CET1
-                2. **Narrative Insights** - Automatically generated explanations of:
-                   - Credit availability changes (CAI)
-                   - Loss drivers (PD vs. LGD contribution)
-                   - Capital impact (CET1 compression)
-                   - Liquidity implications (LCR proxy)
-                3. **Segment Analysis** - Deep-dive by portfolio segment
-                4. **Recommended Actions** - Risk management responses based on severity
-                5. **Exportable Report** - Download as text file for documentation
-                """)
+            render_insights_tab(df, portfolio, scenario, country, rate_col, credit_col)
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,153 @@
+"""
+Download Cache
+Keeps remote file contents in memory and on disk under ~/.cache/capital_flow
+"""
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+
+import pandas as pd
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'capital_flow')
+CACHE_TTL = 24 * 3600  # seconds
+REQUEST_TIMEOUT = 30  # seconds
+RETRY_AFTER = 60  # seconds before a failed download is attempted again
+
+_failures = {}  # url -> (failure time, exception)
+# Fallback flags of the cached_frame build running in this context, if any
+_build_fallbacks = ContextVar('_build_fallbacks', default=None)
+
+
+@lru_cache(maxsize=None)
+def _get_session():
+    """
+    Shared keep-alive session so repeat downloads from one host reuse the
+    connection; the pool is sized for concurrent prefetch threads
+    """
+    # Imported on first download so cached-only runs skip loading requests
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+
+def fetch_bytes(url):
+    """
+    Fetch the raw contents of a URL, reusing a copy younger than CACHE_TTL
+    Returns: bytes
+    """
+    failed_at, error = _failures.get(url, (0, None))
+    if time.time() - failed_at < RETRY_AFTER:
+        raise error
+    
+    try:
+        # The TTL window is part of the memo key so long-running processes refresh
+        return _fetch_bytes(url, int(time.time() // CACHE_TTL))
+    except Exception as e:
+        _failures[url] = (time.time(), e)
+        raise
+
+
+def prefetch(urls):
+    """
+    Download several URLs concurrently into the cache
+    Failures are left for the later fetch_bytes call to raise
+    """
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        for future in [executor.submit(fetch_bytes, url) for url in urls]:
+            future.exception()
+
+
+def note_fallback():
+    """
+    Record that a fetcher substituted synthetic data for a failed source,
+    so the frame being built is not snapshotted
+    Tracked per build and thread: call it from the thread running the build
+    """
+    fallbacks = _build_fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append(True)
+
+
+def _write_atomic(path, write):
+    """
+    Write a cache file via a temporary sibling and rename it into place,
+    so concurrent readers never see a partial file
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def cached_frame(name, ttl=CACHE_TTL):
+    """
+    Decorator persisting a DataFrame-returning function to a Parquet snapshot
+    The snapshot is returned instead of calling the function while younger than ttl
+    Frames built with a synthetic fallback (see note_fallback) are not snapshotted
+    """
+    path = os.path.join(CACHE_DIR, f"{name}.parquet")
+    
+    def decorator(build):
+        @wraps(build)
+        def wrapper():
+            try:
+                if time.time() - os.path.getmtime(path) < ttl:
+                    return pd.read_parquet(path)
+            except Exception:
+                pass  # missing, unreadable or corrupt snapshot: rebuild
+            
+            # Each build (and thread) collects only its own fallbacks
+            fallbacks = []
+            token = _build_fallbacks.set(fallbacks)
+            try:
+                df = build()
+            finally:
+                _build_fallbacks.reset(token)
+            if not fallbacks:
+                try:
+                    _write_atomic(path, lambda tmp_path: df.to_parquet(tmp_path, compression='zstd'))
+                except (OSError, ImportError):
+                    pass  # pyarrow not installed or cache dir not writable
+            return df
+        return wrapper
+    return decorator
+
+
+@lru_cache(maxsize=32)
+def _fetch_bytes(url, ttl_window):
+    path = os.path.join(CACHE_DIR, hashlib.sha1(url.encode()).hexdigest())
+    try:
+        if time.time() - os.path.getmtime(path) < CACHE_TTL:
+            with open(path, 'rb') as f:
+                return f.read()
+    except OSError:
+        pass
+    
+    response = _get_session().get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    content = response.content
+    
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+    
+    try:
+        _write_atomic(path, write)
+    except OSError:
+        pass  # cache dir not writable; the in-memory copy still applies
+    
+    return content
@@ -6,28 +6,47 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 warnings.filterwarnings('ignore')
 
+# Relative inside the src package; plain when run as a script (python src/ingest_us.py)
+try:
+    from ._cache import cached_frame, note_fallback
+except ImportError:
+    from _cache import cached_frame, note_fallback
+
+# Seed for the synthetic fallback data, so dashboards render stable numbers
+SYNTHETIC_SEED = 42
+
 # FRED API - users can get free API key at https://fred.stlouisfed.org/docs/api/api_key.html
 FRED_API_KEY = None  # Set this to use real FRED data
 
-try:
-    from fredapi import Fred
-    if FRED_API_KEY:
-        fred = Fred(api_key=FRED_API_KEY)
-    else:
-        fred = None
-except ImportError:
-    fred = None
+fred = None  # FRED client, created on first use by _get_fred()
+
+
+def _get_fred():
+    """
+    Return the FRED client, importing fredapi on first use
+    Returns None when no API key is set or fredapi is not installed
+    """
+    global fred
+    if fred is None and FRED_API_KEY:
+        try:
+            from fredapi import Fred
+            fred = Fred(api_key=FRED_API_KEY)
+        except ImportError:
+            pass
+    return fred
 
 
 def fetch_fred_series(series_id, name, start_date='2020-01-01'):
     """
     Fetch a single FRED series
     """
-    if fred:
+    client = _get_fred()
+    if client:
         try:
-            data = fred.get_series(series_id, observation_start=start_date)
+            data = client.get_series(series_id, observation_start=start_date)
             return pd.DataFrame({name: data})
         except Exception as e:
             print(f"Error fetching {series_id}: {e}")
@@ -35,74 +54,85 @@ def fetch_fred_series(series_id, name, start_date='2020-01-01'):
     return None
 
 
-def generate_synthetic_us_data(start_date='2020-01-01', end_date='2024-12-31'):
+def _piecewise_path(n, segments):
+    """
+    Piecewise-linear path of length n from (start, stop, length) segments
+    The last segment's length is ignored; it fills whatever remains
+    """
+    path = np.empty(n)
+    pos = 0
+    for start, stop, length in segments[:-1]:
+        path[pos:pos + length] = np.linspace(start, stop, length)
+        pos += length
+    start, stop, _ = segments[-1]
+    path[pos:] = np.linspace(start, stop, n - pos)
+    return path
+
+
+def generate_synthetic_us_data(start_date='2020-01-01', end_date='2024-12-31', seed=SYNTHETIC_SEED):
     """
     Generate realistic synthetic US data when FRED API is not available
     """
     dates = pd.date_range(start=start_date, end=end_date, freq='MS')
+    n = len(dates)
+    rng = np.random.default_rng(seed)
+    
+    # All random draws up front: normal noise for delinquency, loans and
+    # charge-offs; uniform BAA spread (2-5%) and Tier 1 ratio (12-14%)
+    noise = rng.standard_normal((n, 3)) * [0.3, 50000, 0.2]
+    baa_spread, tier1_ratio = rng.uniform([2.0, 12.0], [5.0, 14.0], (n, 2)).T
     
     # Fed Funds Rate: realistic path from 0.25% to 5.5% and back down
-    n = len(dates)
-    fed_rate = np.concatenate([
-        np.linspace(0.25, 0.25, n//4),  # Low rates 2020-2021
-        np.linspace(0.25, 5.5, n//4),   # Rapid hikes 2022
-        np.linspace(5.5, 5.0, n//4),    # Peak
-        np.linspace(5.0, 4.5, n - 3*(n//4))  # Slight cuts
+    fed_rate = _piecewise_path(n, [
+        (0.25, 0.25, n//4),  # Low rates 2020-2021
+        (0.25, 5.5, n//4),   # Rapid hikes 2022
+        (5.5, 5.0, n//4),    # Peak
+        (5.0, 4.5, None)     # Slight cuts
     ])
     
     # Unemployment: 14% in 2020, down to 3.5-4%
-    unemployment = np.concatenate([
-        np.linspace(14.0, 8.0, n//4),
-        np.linspace(8.0, 4.5, n//4),
-        np.linspace(4.5, 3.7, n//2)
+    unemployment = _piecewise_path(n, [
+        (14.0, 8.0, n//4),
+        (8.0, 4.5, n//4),
+        (4.5, 3.7, None)
     ])
     
     # Delinquency rate: 3-11% range, correlated with unemployment
-    delinquency = 2.0 + 0.5 * (unemployment - 4) + np.random.normal(0, 0.3, n)
-    delinquency = np.clip(delinquency, 1.5, 11)
+    delinquency = np.clip(2.0 + 0.5 * (unemployment - 4) + noise[:, 0], 1.5, 11)
     
     # Total loans: $10T to $12T range
-    total_loans = 10000000 + np.linspace(0, 2000000, n) + np.random.normal(0, 50000, n)
+    total_loans = 10000000 + np.linspace(0, 2000000, n) + noise[:, 1]
     
     # CPI: 2% baseline with 2022 spike
     cpi_base = 250
-    cpi_growth = np.concatenate([
-        np.linspace(0, 0.1, n//3),
-        np.linspace(0.1, 0.25, n//6),  # Inflation spike
-        np.linspace(0.25, 0.15, n - n//3 - n//6)
+    cpi_growth = _piecewise_path(n, [
+        (0, 0.1, n//3),
+        (0.1, 0.25, n//6),  # Inflation spike
+        (0.25, 0.15, None)
     ])
-    cpi = cpi_base * np.cumprod(1 + cpi_growth/12)
+    cpi = cpi_base * np.exp(np.cumsum(np.log1p(cpi_growth / 12)))
     
     # GDP growth: quarterly, annualized
     gdp_dates = pd.date_range(start=start_date, end=end_date, freq='QS')
-    gdp_growth = np.random.uniform(-2, 4, len(gdp_dates))
+    gdp_growth = rng.uniform(-2, 4, len(gdp_dates))
     gdp_df = pd.DataFrame({'gdp_growth': gdp_growth}, index=gdp_dates)
     gdp_df = gdp_df.resample('MS').ffill()
     
-    # BAA spread (credit spread): 2-5%
-    baa_spread = np.random.uniform(2.0, 5.0, n)
-    
-    # Tier 1 capital ratio: 12-14%
-    tier1_ratio = np.random.uniform(12.0, 14.0, n)
-    
     # Net charge-off rate: 0.3-2.5%
-    charge_off = 0.5 + 0.15 * (unemployment - 4) + np.random.normal(0, 0.2, n)
-    charge_off = np.clip(charge_off, 0.3, 2.5)
-    
-    df = pd.DataFrame({
-        'fed_funds_rate': fed_rate,
-        'unemployment_rate': unemployment,
-        'delinquency_rate': delinquency,
-        'total_loans': total_loans,
-        'cpi': cpi,
-        'baa_spread': baa_spread,
-        'tier1_capital_ratio': tier1_ratio,
-        'charge_off_rate': charge_off
-    }, index=dates)
+    charge_off = np.clip(0.5 + 0.15 * (unemployment - 4) + noise[:, 2], 0.3, 2.5)
+    
+    # Assemble into one contiguous block
+    columns = ['fed_funds_rate', 'unemployment_rate', 'delinquency_rate', 'total_loans',
+               'cpi', 'baa_spread', 'tier1_capital_ratio', 'charge_off_rate']
+    values = np.empty((n, len(columns)))
+    for i, col in enumerate([fed_rate, unemployment, delinquency, total_loans,
+                             cpi, baa_spread, tier1_ratio, charge_off]):
+        values[:, i] = col
+    df = pd.DataFrame(values, columns=columns, index=dates, copy=False)
     
     # Add GDP growth
     df = df.join(gdp_df, how='left')
-    df = df.fillna(method='ffill')
+    df = df.ffill()
     
     return df
 
@@ -119,32 +149,41 @@ def fetch_us_fred_data():
     - BAA10Y: Moody's BAA Corporate Bond Yield
     - DDOI06USA156NWDB: Bank Capital to Assets Ratio (proxy for Tier 1)
     """
-    if not fred:
+    if not _get_fred():
         print("FRED API not available or no API key set. Using synthetic data.")
         print("To use real data, install fredapi and set FRED_API_KEY in src/ingest_us.py")
+        # Intended offline mode: the seeded frame is deterministic, so it may be snapshotted
         return generate_synthetic_us_data()
     
     try:
         print("Fetching US data from FRED...")
         
-        # Fetch each series
-        fed_rate = fetch_fred_series('FEDFUNDS', 'fed_funds_rate')
-        unemployment = fetch_fred_series('UNRATE', 'unemployment_rate')
-        delinquency = fetch_fred_series('DRALACBS', 'delinquency_rate')
-        loans = fetch_fred_series('TOTLL', 'total_loans')
-        cpi = fetch_fred_series('CPIAUCSL', 'cpi')
-        baa = fetch_fred_series('BAA10Y', 'baa_spread')
+        # Fetch each series concurrently (failed series come back as None)
+        series = [
+            ('FEDFUNDS', 'fed_funds_rate'),
+            ('UNRATE', 'unemployment_rate'),
+            ('DRALACBS', 'delinquency_rate'),
+            ('TOTLL', 'total_loans'),
+            ('CPIAUCSL', 'cpi'),
+            ('BAA10Y', 'baa_spread')
+        ]
+        with ThreadPoolExecutor(max_workers=len(series)) as executor:
+            results = list(executor.map(lambda args: fetch_fred_series(*args), series))
+        # Recorded here, on the build thread, where the snapshot tracking lives
+        if any(df is None for df in results):
+            note_fallback()
         
         # Combine all series
-        dfs = [df for df in [fed_rate, unemployment, delinquency, loans, cpi, baa] if df is not None]
+        dfs = [df for df in results if df is not None]
         
         if dfs:
             df_us = pd.concat(dfs, axis=1)
             df_us = df_us.resample('MS').mean()
-            df_us = df_us.fillna(method='ffill').fillna(method='bfill')
+            df_us = df_us.ffill().bfill()
             
             # Add synthetic columns not easily available from FRED
-            df_us['tier1_capital_ratio'] = np.random.uniform(12.0, 14.0, len(df_us))
+            rng = np.random.default_rng(SYNTHETIC_SEED)
+            df_us['tier1_capital_ratio'] = rng.uniform(12.0, 14.0, len(df_us))
             df_us['charge_off_rate'] = df_us['delinquency_rate'] * 0.4  # Approximation
             
             # Add GDP growth (quarterly)
@@ -152,18 +191,23 @@ def fetch_us_fred_data():
             if gdp is not None:
                 gdp['gdp_growth'] = gdp['gdp'].pct_change(4) * 100
                 df_us = df_us.join(gdp[['gdp_growth']], how='left')
-                df_us['gdp_growth'] = df_us['gdp_growth'].fillna(method='ffill')
+                df_us['gdp_growth'] = df_us['gdp_growth'].ffill()
+            else:
+                note_fallback()
             
             return df_us
         else:
             print("Could not fetch FRED data, using synthetic data")
+            note_fallback()
             return generate_synthetic_us_data()
             
     except Exception as e:
         print(f"Error fetching FRED data: {e}")
+        note_fallback()
         return generate_synthetic_us_data()
 
 
+@cached_frame('us_data')
 def get_us_data():
     """
     Main function to fetch and combine all US data
@@ -192,6 +236,9 @@ def get_us_data():
     # Capital adequacy buffer (distance from minimum 8%)
     df_us['capital_buffer'] = df_us['tier1_capital_ratio'] - 8.0
     
+    # float32 is ample precision for these indicators and halves the footprint
+    df_us = df_us.astype({col: 'float32' for col in df_us.select_dtypes('float64').columns})
+    
     print(f"[OK] Fetched US data: {len(df_us)} months, {df_us.columns.size} indicators")
     print(f"  Date range: {df_us.index.min().strftime('%Y-%m')} to {df_us.index.max().strftime('%Y-%m')}")
     
@@ -202,16 +249,19 @@ def compare_au_us(df_au, df_us):
     """
     Create a comparison dataframe for AU and US indicators
     """
-    comparison = pd.DataFrame({
-        'AU_cash_rate': df_au['cash_rate'],
-        'US_fed_rate': df_us['fed_funds_rate'],
-        'AU_unemployment': df_au['unemployment_rate'],
-        'US_unemployment': df_us['unemployment_rate'],
-        'AU_default_proxy': df_au['default_rate_proxy'],
-        'US_default_proxy': df_us['default_rate_proxy'],
-        'AU_credit_growth': df_au['credit_growth_housing'],
-        'US_credit_growth': df_us['credit_growth']
-    })
+    columns = [
+        df_au['cash_rate'].rename('AU_cash_rate'),
+        df_us['fed_funds_rate'].rename('US_fed_rate'),
+        df_au['unemployment_rate'].rename('AU_unemployment'),
+        df_us['unemployment_rate'].rename('US_unemployment'),
+        df_au['default_rate_proxy'].rename('AU_default_proxy'),
+        df_us['default_rate_proxy'].rename('US_default_proxy'),
+        df_au['credit_growth_housing'].rename('AU_credit_growth'),
+        df_us['credit_growth'].rename('US_credit_growth')
+    ]
+    
+    # One joint outer alignment across both indexes
+    comparison = pd.concat(columns, axis=1, join='outer')
     
     return comparison
 
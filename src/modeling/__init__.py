@@ -17,7 +17,8 @@ from .portfolio import (
     Portfolio,
     create_example_au_portfolio,
     create_example_us_portfolio,
-    compare_portfolios
+    compare_portfolios,
+    format_comparison
 )
 
 __all__ = [
@@ -31,6 +32,7 @@ __all__ = [
     'Portfolio',
     'create_example_au_portfolio',
     'create_example_us_portfolio',
-    'compare_portfolios'
+    'compare_portfolios',
+    'format_comparison'
 ]
 
@@ -5,9 +5,36 @@ Implements CAI (Credit Availability Index), PD/LGD/EAD models, and ECL calculati
 import numpy as np
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
-from scipy.stats import norm
-import warnings
-warnings.filterwarnings('ignore')
+from scipy.special import ndtr, ndtri
+import math
+
+# Compiled Vasicek kernel is used for RWA when numba is installed
+try:
+    from numba import njit, vectorize
+except ImportError:
+    njit = vectorize = None
+
+# Φ⁻¹ at the Basel IRB 99.9% confidence level, used by every RWA calculation
+_PHI_INV_999 = float(ndtri(0.999))
+
+# Floating-point type for bulk RWA/ECL arithmetic; None leaves inputs as given
+# np.float32 halves memory traffic and stays within ~1e-5 relative of float64
+RWA_DTYPE = None
+
+
+def _as_dtype(dtype, *arrays):
+    """
+    Cast inputs to dtype (falling back to RWA_DTYPE); unchanged when both are None
+    Series stay Series so results keep their index
+    """
+    if dtype is None:
+        dtype = RWA_DTYPE
+    if dtype is None:
+        return arrays
+    return tuple(
+        a.astype(dtype) if isinstance(a, pd.Series) else np.asarray(a, dtype=dtype)
+        for a in arrays
+    )
 
 
 class CreditAvailabilityIndex:
@@ -22,6 +49,8 @@ class CreditAvailabilityIndex:
     - GDP growth (positive weight)
     """
     
+    __slots__ = ('weights', 'mu_', 'sd_')
+    
     def __init__(self, weights=None):
         if weights is None:
             self.weights = {
@@ -32,32 +61,51 @@ class CreditAvailabilityIndex:
             }
         else:
             self.weights = weights
+        
+        # Normalization statistics, set by fit()
+        self.mu_ = None
+        self.sd_ = None
+    
+    def fit(self, df, rate_col='cash_rate', credit_col='credit_growth_housing',
+            unemp_col='unemployment_rate', gdp_col='gdp_growth'):
+        """
+        Store component means/stds from a training window for reuse by calculate
+        Returns: self
+        """
+        X = df[[rate_col, credit_col, unemp_col, gdp_col]].to_numpy(dtype=np.float64)
+        self.mu_ = np.nanmean(X, axis=0)
+        self.sd_ = np.nanstd(X, axis=0, ddof=1)
+        return self
     
     def calculate(self, df, rate_col='cash_rate', credit_col='credit_growth_housing',
                   unemp_col='unemployment_rate', gdp_col='gdp_growth'):
         """
         Calculate CAI from macro dataframe
+        Normalizes with the fitted statistics if fit() was called, else with df's own
         Returns: Series with CAI values (0-100 scale)
         """
-        # Normalize each component to z-scores
-        rate_z = (df[rate_col] - df[rate_col].mean()) / df[rate_col].std()
-        credit_z = (df[credit_col] - df[credit_col].mean()) / df[credit_col].std()
-        unemp_z = (df[unemp_col] - df[unemp_col].mean()) / df[unemp_col].std()
-        gdp_z = (df[gdp_col] - df[gdp_col].mean()) / df[gdp_col].std()
+        weights = np.array([
+            self.weights['rate'],
+            self.weights['credit_growth'],
+            self.weights['unemployment'],
+            self.weights['gdp_growth']
+        ])
+        
+        # Normalize each component to z-scores in one pass over an (N, 4) block
+        X = df[[rate_col, credit_col, unemp_col, gdp_col]].to_numpy(dtype=np.float64)
+        if self.mu_ is None:
+            mu, sd = np.nanmean(X, axis=0), np.nanstd(X, axis=0, ddof=1)
+        else:
+            mu, sd = self.mu_, self.sd_
+        z = (X - mu) / sd
         
         # Weighted combination
-        cai_raw = (
-            self.weights['rate'] * rate_z +
-            self.weights['credit_growth'] * credit_z +
-            self.weights['unemployment'] * unemp_z +
-            self.weights['gdp_growth'] * gdp_z
-        )
+        cai_raw = z @ weights
         
         # Scale to 0-100 (50 = neutral)
-        cai = 50 + 10 * cai_raw
-        cai = cai.clip(0, 100)
+        cai = np.clip(50 + 10 * cai_raw, 0, 100)
         
-        return cai
+        return pd.Series(cai, index=df.index)
 
 
 class PDModel:
@@ -72,6 +120,8 @@ class PDModel:
     - macro_adjustment based on unemployment, rates, GDP
     """
     
+    __slots__ = ('base_pd', 'coefficients')
+    
     def __init__(self, base_pd=0.015):
         """
         base_pd: Through-the-cycle baseline default rate (e.g., 1.5%)
@@ -86,29 +136,27 @@ class PDModel:
         
         PD = base_pd × exp(β1×unemployment + β2×rates + β3×GDP)
         """
-        # Normalize features
-        unemp_norm = (df[unemp_col] - 5.0) / 2.0  # Center at 5%, scale by 2pp
-        rate_norm = (df[rate_col] - 2.5) / 2.0    # Center at 2.5%, scale by 2pp
-        gdp_norm = (df[gdp_col] - 2.0) / 2.0      # Center at 2%, scale by 2pp
+        # Normalize features: center at 5% / 2.5% / 2%, scale by 2pp
+        centers = np.array([5.0, 2.5, 2.0])
+        scale = 2.0
         
         # Coefficients (calibrated to typical credit cycles)
-        beta_unemp = 0.4   # 1pp unemployment increase → 40% PD increase
-        beta_rate = 0.2    # 1pp rate increase → 20% PD increase
-        beta_gdp = -0.15   # 1pp GDP growth → 15% PD decrease
+        # 1pp unemployment increase → 40% PD increase
+        # 1pp rate increase → 20% PD increase
+        # 1pp GDP growth → 15% PD decrease
+        betas = np.array([0.4, 0.2, -0.15])
         
-        # Log-linear model
-        log_pd_adj = (
-            beta_unemp * unemp_norm +
-            beta_rate * rate_norm +
-            beta_gdp * gdp_norm
-        )
+        # Fold normalization and base_pd into one affine map on log PD
+        slope = betas / scale
+        intercept = np.log(self.base_pd) - slope @ centers
         
-        pd = self.base_pd * np.exp(log_pd_adj)
+        X = df[[unemp_col, rate_col, gdp_col]].to_numpy(dtype=np.float64)
+        pd_values = np.exp(X @ slope + intercept)
         
         # Cap at reasonable bounds (0.1% to 15%)
-        pd = pd.clip(0.001, 0.15)
+        np.clip(pd_values, 0.001, 0.15, out=pd_values)
         
-        return pd
+        return pd.Series(pd_values, index=df.index)
     
     def calculate_merton(self, asset_value, debt_value, volatility=0.3, time_horizon=1):
         """
@@ -126,7 +174,7 @@ class PDModel:
              (volatility * np.sqrt(time_horizon))
         
         # PD = Φ(-DD)
-        pd = norm.cdf(-dd)
+        pd = ndtr(-dd)
         
         return pd
     
@@ -152,6 +200,8 @@ class LGDModel:
     - Seniority
     """
     
+    __slots__ = ('base_lgd',)
+    
     def __init__(self, base_lgd=0.45):
         """
         base_lgd: Baseline LGD (e.g., 45% for unsecured)
@@ -184,21 +234,31 @@ class LGDModel:
         lgd_dt = lgd_dt.clip(0, 1)
         return lgd_dt
     
+    def _housing_lgd(self, df, price_col):
+        # Base LGD = 20% (well-secured mortgages)
+        # Increases when housing prices fall
+        lgd = 0.20 * (1.0 - df[price_col] / 100 * 0.5)
+        return lgd.clip(0.05, 0.60)
+    
+    def _unsecured_lgd(self, df, price_col):
+        # Unsecured lending: higher base LGD
+        # Constant, so back the Series with a zero-copy read-only broadcast view
+        return pd.Series(np.broadcast_to(np.float64(self.base_lgd), (len(df),)),
+                         index=df.index, copy=False)
+    
+    # Collateral type -> LGD formula; unlisted types are treated as unsecured
+    _FORMULAS = {
+        'housing': _housing_lgd,
+        'unsecured': _unsecured_lgd
+    }
+    
     def calculate_simple(self, df, collateral_type='housing', 
                         price_col='housing_price_growth'):
         """
         Simple LGD model varying with collateral values
         """
-        if collateral_type == 'housing':
-            # Base LGD = 20% (well-secured mortgages)
-            # Increases when housing prices fall
-            lgd = 0.20 * (1.0 - df[price_col] / 100 * 0.5)
-            lgd = lgd.clip(0.05, 0.60)
-        else:
-            # Unsecured lending: higher base LGD
-            lgd = pd.Series(self.base_lgd, index=df.index)
-        
-        return lgd
+        formula = self._FORMULAS.get(collateral_type, self._FORMULAS['unsecured'])
+        return formula(self, df, price_col)
 
 
 class EADModel:
@@ -210,6 +270,8 @@ class EADModel:
     Where CCF = Credit Conversion Factor (typically 50-75% for unfunded lines)
     """
     
+    __slots__ = ('ccf',)
+    
     def __init__(self, ccf=0.75):
         """
         ccf: Credit Conversion Factor
@@ -255,15 +317,19 @@ class ECLCalculator:
     - Stage 2/3: Lifetime ECL
     """
     
+    __slots__ = ('pd_model', 'lgd_model', 'ead_model')
+    
     def __init__(self):
         self.pd_model = PDModel()
         self.lgd_model = LGDModel()
         self.ead_model = EADModel()
     
-    def calculate_12m_ecl(self, pd_12m, lgd, ead):
+    def calculate_12m_ecl(self, pd_12m, lgd, ead, dtype=None):
         """
         12-month ECL for Stage 1 assets
+        dtype: optional float type for the arithmetic (defaults to RWA_DTYPE)
         """
+        pd_12m, lgd, ead = _as_dtype(dtype, pd_12m, lgd, ead)
         ecl = pd_12m * lgd * ead
         return ecl
     
@@ -273,19 +339,33 @@ class ECLCalculator:
         
         Simple approach: sum discounted expected losses
         ECL = Σ PD_t × LGD_t × EAD_t × DF_t
+        
+        With marginal PD uniform over life (PD_t = PD / maturity) the sum
+        collapses to an annuity factor: Σ DF_t = (1 - (1 + r)^-maturity) / r
         """
         discount_rate = 0.05  # 5% discount rate
         
-        ecl = 0
-        for t in range(1, maturity + 1):
-            # Marginal PD in year t (simplified: uniform over life)
-            pd_t = pd_lifetime / maturity
-            
-            # Discount factor
-            df_t = 1 / (1 + discount_rate) ** t
-            
-            # Add to lifetime ECL
-            ecl += pd_t * lgd * ead * df_t
+        # No years to sum over (the closed form would divide by zero)
+        if maturity <= 0:
+            return 0
+        
+        annuity = (1 - (1 + discount_rate) ** -maturity) / discount_rate
+        ecl = pd_lifetime / maturity * lgd * ead * annuity
+        
+        return ecl
+    
+    def calculate_lifetime_ecl_curve(self, pd_curve, lgd, ead, discount_rate=0.05):
+        """
+        Lifetime ECL from a term structure of marginal PDs
+        
+        pd_curve: marginal PD for years 1..T, shape (T,) or (N, T) per loan
+        ECL = (Σ PD_t × DF_t) × LGD × EAD
+        """
+        pd_curve = np.asarray(pd_curve, dtype=np.float64)
+        t = np.arange(1, pd_curve.shape[-1] + 1)
+        df_curve = (1 + discount_rate) ** -t
+        
+        ecl = (pd_curve @ df_curve) * lgd * ead
         
         return ecl
     
@@ -298,7 +378,7 @@ class ECLCalculator:
         stage: 1 (12-month) or 2/3 (lifetime)
         """
         if stage == 1:
-            ecl = df['pd'] * df['lgd'] * exposure
+            ecl = self.calculate_12m_ecl(df['pd'], df['lgd'], exposure)
         else:
             ecl = self.calculate_lifetime_ecl(df['pd'], df['lgd'], exposure)
         
@@ -317,15 +397,90 @@ class ECLCalculator:
         - Stage 2 if PD doubled since origination
         - Stage 1 otherwise
         """
-        if dpd > 90:
-            return 3
-        elif current_pd > 2 * origination_pd:
-            return 2
-        else:
-            return 1
+        return int(self.stage_classification_vec(current_pd, origination_pd, dpd))
+    
+    def stage_classification_vec(self, current_pd, origination_pd, dpd=0):
+        """
+        Array version of stage_classification for a whole loan book
+        Returns: int8 array of stages (1, 2 or 3)
+        """
+        current_pd = np.asarray(current_pd)
+        origination_pd = np.asarray(origination_pd)
+        dpd = np.asarray(dpd)
+        
+        stage = np.where(dpd > 90, 3, np.where(current_pd > 2 * origination_pd, 2, 1))
+        return stage.astype(np.int8)
+
+
+# Acklam's rational approximation to the inverse normal CDF
+_ACKLAM_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+             1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_ACKLAM_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+             6.680131188771972e+01, -1.328068155288572e+01)
+_ACKLAM_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+             -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_ACKLAM_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+             3.754408661907416e+00)
+
+
+def _norm_cdf(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2.0))
+
+
+def _norm_ppf(p):
+    """
+    Inverse normal CDF for 0 < p < 1
+    Acklam's approximation refined with one Halley step to double precision
+    """
+    a, b, c, d = _ACKLAM_A, _ACKLAM_B, _ACKLAM_C, _ACKLAM_D
+    
+    if p < 0.02425:
+        q = math.sqrt(-2.0 * math.log(p))
+        x = (((((c[0]*q + c[1])*q + c[2])*q + c[3])*q + c[4])*q + c[5]) / \
+            ((((d[0]*q + d[1])*q + d[2])*q + d[3])*q + 1.0)
+    elif p > 1.0 - 0.02425:
+        q = math.sqrt(-2.0 * math.log(1.0 - p))
+        x = -(((((c[0]*q + c[1])*q + c[2])*q + c[3])*q + c[4])*q + c[5]) / \
+            ((((d[0]*q + d[1])*q + d[2])*q + d[3])*q + 1.0)
+    else:
+        q = p - 0.5
+        r = q * q
+        x = (((((a[0]*r + a[1])*r + a[2])*r + a[3])*r + a[4])*r + a[5]) * q / \
+            (((((b[0]*r + b[1])*r + b[2])*r + b[3])*r + b[4])*r + 1.0)
+    
+    e = _norm_cdf(x) - p
+    u = e * math.sqrt(2.0 * math.pi) * math.exp(0.5 * x * x)
+    return x - u / (1.0 + 0.5 * x * u)
 
 
-def calculate_rwa_simple(ead, pd, lgd, correlation=0.15):
+def _rwa_kernel(ead, pd, lgd, correlation):
+    """
+    Scalar form of calculate_rwa_simple, compiled into a ufunc with numba
+    """
+    if pd < 0.0001:
+        pd = 0.0001
+    elif pd > 0.9999:
+        pd = 0.9999
+    
+    k = lgd * _norm_cdf(
+        math.sqrt(1.0 - correlation) * _norm_ppf(pd) + math.sqrt(correlation) * _PHI_INV_999
+    ) - pd * lgd
+    
+    b = (0.11852 - 0.05478 * math.log(pd)) ** 2
+    maturity_adj = 1.0 / (1.0 - 1.5 * b)
+    
+    return ead * k * maturity_adj * 12.5
+
+
+if vectorize is not None:
+    _norm_cdf = njit(fastmath=True, cache=True)(_norm_cdf)
+    _norm_ppf = njit(fastmath=True, cache=True)(_norm_ppf)
+    _rwa_kernel = vectorize(['float32(float32, float32, float32, float32)',
+                             'float64(float64, float64, float64, float64)'],
+                            fastmath=True, cache=True)(_rwa_kernel)
+
+
+def calculate_rwa_simple(ead, pd, lgd, correlation=0.15, dtype=None):
     """
     Simplified Risk-Weighted Assets (RWA) calculation
     Based on Basel IRB formula (simplified)
@@ -335,28 +490,32 @@ def calculate_rwa_simple(ead, pd, lgd, correlation=0.15):
     Where RW (risk weight) depends on PD, LGD, and asset correlation
     
     Correlation = 0.15 for retail, 0.12-0.24 for corporate
+    
+    dtype: optional float type for the arithmetic (defaults to RWA_DTYPE)
     """
+    ead, pd, lgd, correlation = _as_dtype(dtype, ead, pd, lgd, correlation)
+    
+    if vectorize is not None:
+        return _rwa_kernel(ead, pd, lgd, correlation)
+    
     # Vasicek formula for capital requirement (K)
     # K = LGD × Φ(sqrt(1/(1-R)) × Φ⁻¹(PD) + sqrt(R/(1-R)) × Φ⁻¹(0.999)) - PD × LGD
     
     pd = np.clip(pd, 0.0001, 0.9999)  # Avoid numerical issues
     
-    phi_inv_pd = norm.ppf(pd)
-    phi_inv_999 = norm.ppf(0.999)
-    
     sqrt_r = np.sqrt(correlation)
     sqrt_1_r = np.sqrt(1 - correlation)
     
-    k = lgd * norm.cdf(
-        sqrt_1_r * phi_inv_pd + sqrt_r * phi_inv_999
+    k = lgd * ndtr(
+        sqrt_1_r * ndtri(pd) + sqrt_r * _PHI_INV_999
     ) - pd * lgd
     
     # Maturity adjustment (simplified: M = 2.5 years)
     # b = (0.11852 - 0.05478 × ln(PD))²
+    # (1 + (M - 2.5) × b) / (1 - 1.5 × b) reduces to 1 / (1 - 1.5 × b) at M = 2.5
     b = (0.11852 - 0.05478 * np.log(pd)) ** 2
-    maturity_adj = (1 + (2.5 - 2.5) * b) / (1 - 1.5 * b)
     
-    k_adj = k * maturity_adj
+    k_adj = k / (1 - 1.5 * b)
     
     # RWA = EAD × K × 12.5
     rwa = ead * k_adj * 12.5
@@ -6,20 +6,92 @@ import numpy as np
 import pandas as pd
 from .core import PDModel, LGDModel, EADModel, ECLCalculator, calculate_rwa_simple, calculate_capital_requirement
 
+# Compiled single-pass stress kernel is used when numba is installed
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Segment fields and the dtype each is materialized with
+SEGMENT_DTYPES = {
+    'segment': object,
+    'type': object,
+    'n_loans': np.int64,
+    'avg_exposure': np.float64,
+    'total_ead': np.float64,
+    'avg_pd': np.float64,
+    'avg_lgd': np.float64,
+    'correlation': np.float64
+}
+
+
+def _stress_kernel(pd, lgd, ead, pd_shock, lgd_shock, ead_shock):
+    """
+    Stressed PD, LGD (capped at 1), EAD and ECL per segment in one pass
+    """
+    n = len(pd)
+    pd_stressed = np.empty(n)
+    lgd_stressed = np.empty(n)
+    ead_stressed = np.empty(n)
+    ecl_stressed = np.empty(n)
+    for i in range(n):
+        pd_stressed[i] = pd[i] * pd_shock
+        lgd_stressed[i] = min(lgd[i] * lgd_shock, 1.0)
+        ead_stressed[i] = ead[i] * ead_shock
+        ecl_stressed[i] = pd_stressed[i] * lgd_stressed[i] * ead_stressed[i]
+    return pd_stressed, lgd_stressed, ead_stressed, ecl_stressed
+
+
+if njit is not None:
+    _stress_kernel = njit(fastmath=True, cache=True)(_stress_kernel)
+
 
 class Portfolio:
     """
     Credit Portfolio with risk aggregation
     """
     
-    def __init__(self, name="Portfolio"):
+    __slots__ = ('name', '_segments', '_n_segments', '_exposures', '_derived_inputs',
+                 'pd_model', 'lgd_model', 'ead_model', 'ecl_calculator')
+
+    # Input columns each derived column is calculated from
+    _ECL_INPUTS = ('avg_pd', 'avg_lgd', 'total_ead')
+    _RWA_INPUTS = ('total_ead', 'avg_pd', 'avg_lgd', 'correlation')
+    
+    def __init__(self, name="Portfolio", n_segments=None):
+        """
+        n_segments: Expected number of segments, if known, to preallocate storage
+        """
         self.name = name
-        self.exposures = pd.DataFrame()
+        if n_segments is None:
+            self._segments = {field: [] for field in SEGMENT_DTYPES}
+        else:
+            self._segments = {
+                field: np.empty(n_segments, dtype=dtype)
+                for field, dtype in SEGMENT_DTYPES.items()
+            }
+        self._n_segments = 0
+        self._exposures = None
+        self._derived_inputs = {}
         self.pd_model = PDModel()
         self.lgd_model = LGDModel()
         self.ead_model = EADModel()
         self.ecl_calculator = ECLCalculator()
     
+    @property
+    def exposures(self):
+        """
+        Segment DataFrame, built once from the added segments
+        """
+        if self._exposures is None:
+            self._exposures = pd.DataFrame({
+                field: np.asarray(values[:self._n_segments], dtype=SEGMENT_DTYPES[field])
+                for field, values in self._segments.items()
+            })
+            # Segment names are unique labels; integer codes keep lookups and merges cheap
+            self._exposures['segment'] = self._exposures['segment'].astype('category')
+        return self._exposures
+    
     def add_segment(self, segment_name, n_loans, avg_exposure, avg_pd, avg_lgd,
                    correlation=0.15, segment_type='retail'):
         """
@@ -32,52 +104,82 @@ class Portfolio:
         avg_lgd: Average LGD
         correlation: Asset correlation (0.15 for retail, 0.24 for corporate)
         """
-        total_ead = n_loans * avg_exposure
+        values = {
+            'segment': segment_name,
+            'type': segment_type,
+            'n_loans': n_loans,
+            'avg_exposure': avg_exposure,
+            'total_ead': n_loans * avg_exposure,
+            'avg_pd': avg_pd,
+            'avg_lgd': avg_lgd,
+            'correlation': correlation
+        }
+        i = self._n_segments
+        preallocated = isinstance(self._segments['segment'], np.ndarray)
+        if preallocated and i == len(self._segments['segment']):
+            # Preallocated capacity used up; continue with growable lists
+            self._segments = {field: list(column) for field, column in self._segments.items()}
+            preallocated = False
         
-        segment = pd.DataFrame({
-            'segment': [segment_name],
-            'type': [segment_type],
-            'n_loans': [n_loans],
-            'avg_exposure': [avg_exposure],
-            'total_ead': [total_ead],
-            'avg_pd': [avg_pd],
-            'avg_lgd': [avg_lgd],
-            'correlation': [correlation]
-        })
+        for field, value in values.items():
+            if preallocated:
+                self._segments[field][i] = value
+            else:
+                self._segments[field].append(value)
+        self._n_segments += 1
         
-        self.exposures = pd.concat([self.exposures, segment], ignore_index=True)
+        # Rebuilt on next access; derived ECL/RWA columns are recalculated
+        self.invalidate()
+    
+    def invalidate(self):
+        """
+        Drop the exposures frame and its derived ECL/RWA columns
+        Edits made directly to exposures are detected anyway; this forces a rebuild
+        """
+        self._exposures = None
+        self._derived_inputs = {}
+    
+    def _is_current(self, column, inputs):
+        """
+        Whether a derived column exists and its input columns are unchanged
+        since it was calculated; records the inputs when it is not
+        """
+        current = self.exposures[list(inputs)].to_numpy(copy=True)
+        cached = self._derived_inputs.get(column)
+        if column in self.exposures.columns and cached is not None and np.array_equal(cached, current):
+            return True
+        self._derived_inputs[column] = current
+        return False
     
     def calculate_ecl(self):
         """
         Calculate ECL for entire portfolio
+        Reuses the columns from an earlier call while the PD/LGD/EAD inputs are unchanged
         """
-        self.exposures['ecl_12m'] = (
-            self.exposures['avg_pd'] * 
-            self.exposures['avg_lgd'] * 
-            self.exposures['total_ead']
-        )
-        
-        # Lifetime ECL (simplified: 5x 12-month for stage 2/3)
-        self.exposures['ecl_lifetime'] = self.exposures['ecl_12m'] * 5
+        if not self._is_current('ecl_12m', self._ECL_INPUTS):
+            self.exposures['ecl_12m'] = self.ecl_calculator.calculate_12m_ecl(
+                self.exposures['avg_pd'].to_numpy(),
+                self.exposures['avg_lgd'].to_numpy(),
+                self.exposures['total_ead'].to_numpy()
+            )
+            
+            # Lifetime ECL (simplified: 5x 12-month for stage 2/3)
+            self.exposures['ecl_lifetime'] = self.exposures['ecl_12m'] * 5
         
         return self.exposures[['segment', 'ecl_12m', 'ecl_lifetime']]
     
     def calculate_rwa(self):
         """
         Calculate RWA for each segment using Basel IRB formula
+        Reuses the column from an earlier call while its inputs are unchanged
         """
-        rwa_list = []
-        
-        for idx, row in self.exposures.iterrows():
-            rwa = calculate_rwa_simple(
-                ead=row['total_ead'],
-                pd=row['avg_pd'],
-                lgd=row['avg_lgd'],
-                correlation=row['correlation']
+        if not self._is_current('rwa', self._RWA_INPUTS):
+            self.exposures['rwa'] = calculate_rwa_simple(
+                ead=self.exposures['total_ead'].to_numpy(),
+                pd=self.exposures['avg_pd'].to_numpy(),
+                lgd=self.exposures['avg_lgd'].to_numpy(),
+                correlation=self.exposures['correlation'].to_numpy()
             )
-            rwa_list.append(rwa)
-        
-        self.exposures['rwa'] = rwa_list
         
         return self.exposures[['segment', 'total_ead', 'rwa']]
     
@@ -88,8 +190,7 @@ class Portfolio:
         CET1 ratio: 10.5% (including buffers)
         Tier 1 ratio: 8.5%
         """
-        if 'rwa' not in self.exposures.columns:
-            self.calculate_rwa()
+        self.calculate_rwa()
         
         total_rwa = self.exposures['rwa'].sum()
         
@@ -112,31 +213,74 @@ class Portfolio:
         """
         stressed = self.exposures.copy()
         
-        stressed['avg_pd_stressed'] = stressed['avg_pd'] * pd_shock
-        stressed['avg_lgd_stressed'] = np.minimum(stressed['avg_lgd'] * lgd_shock, 1.0)
-        stressed['total_ead_stressed'] = stressed['total_ead'] * ead_shock
+        if njit is not None:
+            pd_stressed, lgd_stressed, ead_stressed, ecl_stressed = _stress_kernel(
+                stressed['avg_pd'].to_numpy(np.float64),
+                stressed['avg_lgd'].to_numpy(np.float64),
+                stressed['total_ead'].to_numpy(np.float64),
+                float(pd_shock), float(lgd_shock), float(ead_shock)
+            )
+            stressed['avg_pd_stressed'] = pd_stressed
+            stressed['avg_lgd_stressed'] = lgd_stressed
+            stressed['total_ead_stressed'] = ead_stressed
+            stressed['ecl_stressed'] = ecl_stressed
+        else:
+            stressed['avg_pd_stressed'] = stressed['avg_pd'] * pd_shock
+            stressed['avg_lgd_stressed'] = np.minimum(stressed['avg_lgd'] * lgd_shock, 1.0)
+            stressed['total_ead_stressed'] = stressed['total_ead'] * ead_shock
+            
+            # Recalculate ECL under stress
+            stressed['ecl_stressed'] = (
+                stressed['avg_pd_stressed'] * 
+                stressed['avg_lgd_stressed'] * 
+                stressed['total_ead_stressed']
+            )
         
-        # Recalculate ECL under stress
-        stressed['ecl_stressed'] = (
-            stressed['avg_pd_stressed'] * 
-            stressed['avg_lgd_stressed'] * 
-            stressed['total_ead_stressed']
+        # Recalculate RWA under stress
+        stressed['rwa_stressed'] = calculate_rwa_simple(
+            ead=stressed['total_ead_stressed'].to_numpy(),
+            pd=stressed['avg_pd_stressed'].to_numpy(),
+            lgd=stressed['avg_lgd_stressed'].to_numpy(),
+            correlation=stressed['correlation'].to_numpy()
         )
         
-        # Recalculate RWA under stress
-        rwa_stressed = []
-        for idx, row in stressed.iterrows():
-            rwa = calculate_rwa_simple(
-                ead=row['total_ead_stressed'],
-                pd=row['avg_pd_stressed'],
-                lgd=row['avg_lgd_stressed'],
-                correlation=row['correlation']
-            )
-            rwa_stressed.append(rwa)
+        return stressed
+    
+    def stress_grid(self, shocks):
+        """
+        Apply a grid of stresses to the portfolio in one pass
         
-        stressed['rwa_stressed'] = rwa_stressed
+        shocks: sequence of (pd_shock, lgd_shock, ead_shock) tuples
         
-        return stressed
+        Returns: list of DataFrames, one per shock, as from stress_portfolio
+        """
+        shocks = np.asarray(shocks, dtype=np.float64).reshape(-1, 3)
+        
+        # (S, 1) shocks broadcast against (K,) segments to (S, K) arrays
+        pd_shock, lgd_shock, ead_shock = shocks[:, 0:1], shocks[:, 1:2], shocks[:, 2:3]
+        pd_stressed = self.exposures['avg_pd'].to_numpy() * pd_shock
+        lgd_stressed = np.minimum(self.exposures['avg_lgd'].to_numpy() * lgd_shock, 1.0)
+        ead_stressed = self.exposures['total_ead'].to_numpy() * ead_shock
+        
+        ecl_stressed = pd_stressed * lgd_stressed * ead_stressed
+        rwa_stressed = calculate_rwa_simple(
+            ead=ead_stressed,
+            pd=pd_stressed,
+            lgd=lgd_stressed,
+            correlation=self.exposures['correlation'].to_numpy()
+        )
+        
+        results = []
+        for i in range(len(shocks)):
+            stressed = self.exposures.copy()
+            stressed['avg_pd_stressed'] = pd_stressed[i]
+            stressed['avg_lgd_stressed'] = lgd_stressed[i]
+            stressed['total_ead_stressed'] = ead_stressed[i]
+            stressed['ecl_stressed'] = ecl_stressed[i]
+            stressed['rwa_stressed'] = rwa_stressed[i]
+            results.append(stressed)
+        
+        return results
     
     def summary(self):
         """
@@ -151,10 +295,8 @@ class Portfolio:
             return
         
         # Calculate metrics if not already done
-        if 'ecl_12m' not in self.exposures.columns:
-            self.calculate_ecl()
-        if 'rwa' not in self.exposures.columns:
-            self.calculate_rwa()
+        self.calculate_ecl()
+        self.calculate_rwa()
         
         print(f"\nTotal Exposure (EAD): ${self.exposures['total_ead'].sum():,.0f}")
         print(f"Total ECL (12-month): ${self.exposures['ecl_12m'].sum():,.0f}")
@@ -168,13 +310,13 @@ class Portfolio:
         
         print(f"\nSegment Breakdown:")
         print("-" * 60)
-        for idx, row in self.exposures.iterrows():
-            print(f"\n{row['segment']}:")
-            print(f"  EAD: ${row['total_ead']:,.0f}")
-            print(f"  Avg PD: {row['avg_pd']:.2%}")
-            print(f"  Avg LGD: {row['avg_lgd']:.2%}")
-            print(f"  ECL: ${row['ecl_12m']:,.0f}")
-            print(f"  RWA: ${row['rwa']:,.0f}")
+        for row in self.exposures.itertuples(index=False):
+            print(f"\n{row.segment}:")
+            print(f"  EAD: ${row.total_ead:,.0f}")
+            print(f"  Avg PD: {row.avg_pd:.2%}")
+            print(f"  Avg LGD: {row.avg_lgd:.2%}")
+            print(f"  ECL: ${row.ecl_12m:,.0f}")
+            print(f"  RWA: ${row.rwa:,.0f}")
 
 
 def create_example_au_portfolio():
@@ -294,49 +436,63 @@ def create_example_us_portfolio():
     return portfolio
 
 
+# Display format for each compare_portfolios row
+COMPARISON_FORMATS = {
+    'Total EAD': '${:,.0f}',
+    'Total ECL (12m)': '${:,.0f}',
+    'Total RWA': '${:,.0f}',
+    'CET1 Required': '${:,.0f}',
+    'ECL / EAD (%)': '{:.3f}%',
+    'RWA / EAD (%)': '{:.1f}%'
+}
+
+
 def compare_portfolios(portfolio_au, portfolio_us):
     """
     Compare two portfolios side by side
+    Returns: DataFrame with a 'Metric' column and numeric values per country
+    (see format_comparison for display strings)
     """
-    # Calculate metrics for both
-    portfolio_au.calculate_ecl()
-    portfolio_au.calculate_rwa()
-    portfolio_us.calculate_ecl()
-    portfolio_us.calculate_rwa()
-    
-    capital_au = portfolio_au.calculate_capital()
-    capital_us = portfolio_us.calculate_capital()
+    columns = {}
+    for label, portfolio in (('Australia', portfolio_au), ('United States', portfolio_us)):
+        # Calculate metrics once, then reuse the totals for every row
+        portfolio.calculate_ecl()
+        portfolio.calculate_rwa()
+        capital = portfolio.calculate_capital()
+        
+        total_ead = portfolio.exposures['total_ead'].sum()
+        total_ecl = portfolio.exposures['ecl_12m'].sum()
+        total_rwa = capital['total_rwa']
+        
+        columns[label] = np.array([
+            total_ead,
+            total_ecl,
+            total_rwa,
+            capital['cet1_required'],
+            total_ecl / total_ead * 100,
+            total_rwa / total_ead * 100
+        ], dtype=np.float64)
     
     comparison = pd.DataFrame({
-        'Metric': [
-            'Total EAD',
-            'Total ECL (12m)',
-            'Total RWA',
-            'CET1 Required',
-            'ECL / EAD (%)',
-            'RWA / EAD (%)'
-        ],
-        'Australia': [
-            f"${portfolio_au.exposures['total_ead'].sum():,.0f}",
-            f"${portfolio_au.exposures['ecl_12m'].sum():,.0f}",
-            f"${portfolio_au.exposures['rwa'].sum():,.0f}",
-            f"${capital_au['cet1_required']:,.0f}",
-            f"{portfolio_au.exposures['ecl_12m'].sum() / portfolio_au.exposures['total_ead'].sum() * 100:.3f}%",
-            f"{portfolio_au.exposures['rwa'].sum() / portfolio_au.exposures['total_ead'].sum() * 100:.1f}%"
-        ],
-        'United States': [
-            f"${portfolio_us.exposures['total_ead'].sum():,.0f}",
-            f"${portfolio_us.exposures['ecl_12m'].sum():,.0f}",
-            f"${portfolio_us.exposures['rwa'].sum():,.0f}",
-            f"${capital_us['cet1_required']:,.0f}",
-            f"{portfolio_us.exposures['ecl_12m'].sum() / portfolio_us.exposures['total_ead'].sum() * 100:.3f}%",
-            f"{portfolio_us.exposures['rwa'].sum() / portfolio_us.exposures['total_ead'].sum() * 100:.1f}%"
-        ]
+        'Metric': list(COMPARISON_FORMATS),
+        **columns
     })
     
     return comparison
 
 
+def format_comparison(comparison):
+    """
+    Format a compare_portfolios result for display
+    Returns: copy of the DataFrame with values rendered as strings
+    """
+    formats = comparison['Metric'].map(COMPARISON_FORMATS)
+    formatted = comparison.copy()
+    for col in comparison.columns.drop('Metric'):
+        formatted[col] = [fmt.format(value) for fmt, value in zip(formats, comparison[col])]
+    return formatted
+
+
 if __name__ == "__main__":
     print("\n" + "="*70)
     print("CREDIT PORTFOLIO ANALYSIS - AUSTRALIA vs UNITED STATES")
@@ -355,7 +511,7 @@ if __name__ == "__main__":
     print("PORTFOLIO COMPARISON")
     print("="*70)
     comparison = compare_portfolios(au_portfolio, us_portfolio)
-    print("\n" + comparison.to_string(index=False))
+    print("\n" + format_comparison(comparison).to_string(index=False))
     
     # Stress test
     print("\n" + "="*70)
@@ -4,32 +4,155 @@ Generates professional risk report narratives from model outputs
 """
 import pandas as pd
 import numpy as np
+from bisect import bisect_left, bisect_right
 from typing import Dict, Any, List
 
+# Severity bucket by |ECL change| (%): above 25 Moderate, above 50 Severe
+SEVERITY_THRESHOLDS = (25.0, 50.0)
+SEVERITY_LABELS = ('Mild', 'Moderate', 'Severe')
+
+# Recommended actions by |ECL change| (%): above 20, above 40
+ACTION_THRESHOLDS = (20.0, 40.0)
+ACTION_TEMPLATES = (
+    "- Continue normal monitoring\n"
+    "- No immediate action required\n",
+    "- Monitor credit metrics closely\n"
+    "- Adjust pricing for risk\n"
+    "- Maintain elevated provisions\n",
+    "- Tighten underwriting standards (LVR/LTI limits)\n"
+    "- Increase provisions proactively\n"
+    "- Review and potentially reduce exposures to high-risk segments\n"
+)
+
+# Capital urgency by headroom to target CET1 (pp): below 1.0, below 2.0
+URGENCY_THRESHOLDS = (1.0, 2.0)
+URGENCY_LABELS = (
+    "threshold management or RWA optimization required",
+    "headroom narrows, monitor closely",
+    "adequate buffer maintained"
+)
+
+# LCR impact and risk level by funding spread shock (bps): above 25, above 50
+LIQUIDITY_THRESHOLDS = (25.0, 50.0)
+LIQUIDITY_LEVELS = (
+    ("remains adequate", "limited liquidity stress"),
+    ("approaches floor", "moderate liquidity pressure"),
+    ("dips below 1.0", "elevated short-term liquidity risk")
+)
+
+NARRATIVE_HEADER = (
+    "### {scenario_name} Scenario\n\n"
+    "**Severity:** {severity} ({ecl_change:+.1f}% ECL impact)\n\n"
+    "**Key Drivers:**\n"
+)
+DRIVER_TEMPLATES = (
+    ('rate_shock', "- Interest rates: {:+.0f}bps\n"),
+    ('unemployment_shock', "- Unemployment: {:+.1f}pp\n"),
+    ('housing_shock', "- Housing prices: {:+.1f}%\n")
+)
+NARRATIVE_IMPACT = (
+    "\n**Impact Summary:**\n"
+    "- Credit availability falls {cai_change:.1f}%\n"
+    "- Expected credit losses increase {ecl_change:.1f}%\n"
+    "- Capital ratio compressed by {cet1_change:.1f}pp\n"
+    "\n**Recommended Actions:**\n"
+)
+
+
+def _fast_markdown(df: pd.DataFrame) -> str:
+    """
+    Render a frame of preformatted cells as a pipe table, without the
+    per-column width pass tabulate does in DataFrame.to_markdown
+    """
+    header = "| " + " | ".join(map(str, df.columns)) + " |\n"
+    sep = "|" + "|".join(["---"] * len(df.columns)) + "|\n"
+    rows = "\n".join(
+        "| " + " | ".join(map(str, row)) + " |"
+        for row in df.itertuples(index=False, name=None)
+    )
+    return header + sep + rows
+
 
 class ScenarioReport:
     """
     Generate structured scenario insights and projections
+    
+    Metrics are stored column-wise, one list per field, in insertion order
     """
     
+    __slots__ = (
+        'scenario_name', 'description', 'narratives',
+        '_index', '_names', '_baseline', '_scenario', '_delta_abs', '_delta_pct', '_unit'
+    )
+    
     def __init__(self, scenario_name: str, description: str):
         self.scenario_name = scenario_name
         self.description = description
-        self.metrics = {}
         self.narratives = []
+        self._index = {}
+        self._names = []
+        self._baseline = []
+        self._scenario = []
+        self._delta_abs = []
+        self._delta_pct = []
+        self._unit = []
+    
+    def _store(self, name, baseline, scenario, delta_abs, delta_pct, unit):
+        """Append a metric row, or overwrite it if the name is already tracked"""
+        i = self._index.get(name)
+        if i is None:
+            self._index[name] = len(self._names)
+            self._names.append(name)
+            self._baseline.append(baseline)
+            self._scenario.append(scenario)
+            self._delta_abs.append(delta_abs)
+            self._delta_pct.append(delta_pct)
+            self._unit.append(unit)
+        else:
+            self._baseline[i] = baseline
+            self._scenario[i] = scenario
+            self._delta_abs[i] = delta_abs
+            self._delta_pct[i] = delta_pct
+            self._unit[i] = unit
+    
+    @property
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics as {name: {baseline, scenario, delta_abs, delta_pct, unit}}"""
+        return {
+            name: {
+                'baseline': baseline,
+                'scenario': scenario,
+                'delta_abs': d_abs,
+                'delta_pct': d_pct,
+                'unit': unit
+            }
+            for name, baseline, scenario, d_abs, d_pct, unit in zip(
+                self._names, self._baseline, self._scenario,
+                self._delta_abs, self._delta_pct, self._unit
+            )
+        }
     
     def add_metric(self, name: str, baseline: float, scenario: float, unit: str = "%"):
         """Add a metric to track"""
         delta_abs = scenario - baseline
         delta_pct = (scenario / baseline - 1) * 100 if baseline != 0 else 0
         
-        self.metrics[name] = {
-            'baseline': baseline,
-            'scenario': scenario,
-            'delta_abs': delta_abs,
-            'delta_pct': delta_pct,
-            'unit': unit
-        }
+        self._store(name, baseline, scenario, delta_abs, delta_pct, unit)
+    
+    def add_metrics_bulk(self, names: List[str], baselines, scenarios, unit: str = "%"):
+        """Add several metrics sharing a unit, computing the deltas as arrays"""
+        baselines = np.asarray(baselines, dtype=np.float64)
+        scenarios = np.asarray(scenarios, dtype=np.float64)
+        
+        delta_abs = scenarios - baselines
+        nonzero = baselines != 0
+        delta_pct = np.divide(scenarios, baselines, out=np.ones_like(baselines), where=nonzero)
+        delta_pct = (delta_pct - 1) * 100  # zero where baseline is zero
+        
+        for name, baseline, scenario, d_abs, d_pct in zip(
+            names, baselines.tolist(), scenarios.tolist(), delta_abs.tolist(), delta_pct.tolist()
+        ):
+            self._store(name, baseline, scenario, d_abs, d_pct, unit)
     
     def add_narrative(self, insight: str):
         """Add a narrative insight"""
@@ -37,47 +160,50 @@ class ScenarioReport:
     
     def get_comparison_table(self) -> pd.DataFrame:
         """Generate comparison table"""
-        rows = []
-        for metric, values in self.metrics.items():
-            rows.append({
-                'Metric': metric,
-                'Baseline': f"{values['baseline']:.2f}{values['unit']}",
-                'Scenario': f"{values['scenario']:.2f}{values['unit']}",
-                'Δ (abs)': f"{values['delta_abs']:+.2f}{values['unit']}",
-                'Δ (%)': f"{values['delta_pct']:+.1f}%"
-            })
+        units = self._unit
+        
+        def column(values, fmt):
+            return [format(v, fmt) + unit for v, unit in zip(values, units)]
         
-        return pd.DataFrame(rows)
+        return pd.DataFrame({
+            'Metric': list(self._names),
+            'Baseline': column(self._baseline, '.2f'),
+            'Scenario': column(self._scenario, '.2f'),
+            'Δ (abs)': column(self._delta_abs, '+.2f'),
+            'Δ (%)': [f"{d_pct:+.1f}%" for d_pct in self._delta_pct]
+        })
     
     def generate_summary(self) -> str:
         """Generate executive summary"""
-        summary = f"## Scenario: {self.scenario_name}\n\n"
-        summary += f"**Description:** {self.description}\n\n"
+        parts = [
+            f"## Scenario: {self.scenario_name}\n\n",
+            f"**Description:** {self.description}\n\n"
+        ]
         
         # Headline metrics
-        if 'CAI' in self.metrics:
-            cai_change = self.metrics['CAI']['delta_pct']
-            summary += f"**Headline:** CAI {cai_change:+.1f}%"
+        index = self._index
+        if 'CAI' in index:
+            cai_change = self._delta_pct[index['CAI']]
+            parts.append(f"**Headline:** CAI {cai_change:+.1f}%")
         
-        if 'ECL' in self.metrics:
-            ecl_change = self.metrics['ECL']['delta_pct']
-            summary += f", ECL {ecl_change:+.1f}%"
+        if 'ECL' in index:
+            ecl_change = self._delta_pct[index['ECL']]
+            parts.append(f", ECL {ecl_change:+.1f}%")
         
-        if 'CET1' in self.metrics:
-            cet1_change = self.metrics['CET1']['delta_abs']
-            summary += f", CET1 {cet1_change:+.1f}pp"
+        if 'CET1' in index:
+            cet1_change = self._delta_abs[index['CET1']]
+            parts.append(f", CET1 {cet1_change:+.1f}pp")
         
-        summary += "\n\n"
+        parts.append("\n\n")
         
         # Key insights
-        summary += "**Key Insights:**\n"
-        for i, narrative in enumerate(self.narratives, 1):
-            summary += f"{i}. {narrative}\n"
+        parts.append("**Key Insights:**\n")
+        parts.extend(f"{i}. {narrative}\n" for i, narrative in enumerate(self.narratives, 1))
         
-        return summary
+        return "".join(parts)
 
 
-def generate_scenario_insights(portfolio, df_macro, scenario, baseline_metrics):
+def generate_scenario_insights(portfolio, df_macro, scenario, baseline_metrics, latest_base=None):
     """
     Generate comprehensive scenario insights
     
@@ -86,6 +212,7 @@ def generate_scenario_insights(portfolio, df_macro, scenario, baseline_metrics):
         df_macro: DataFrame with macro data
         scenario: Stress scenario object
         baseline_metrics: Dict with baseline CAI, ECL, RWA, CET1
+        latest_base: Optional last row of df_macro, shared across scenarios
     
     Returns:
         ScenarioReport object
@@ -93,7 +220,9 @@ def generate_scenario_insights(portfolio, df_macro, scenario, baseline_metrics):
     from ..stress.scenarios import apply_scenario_to_portfolio
     
     # Apply scenario
-    stressed_results, df_stressed = apply_scenario_to_portfolio(portfolio, scenario, df_macro)
+    if latest_base is None:
+        latest_base = df_macro.iloc[-1].to_dict()
+    stressed_results, df_stressed = apply_scenario_to_portfolio(portfolio, scenario, df_macro, latest_base)
     
     # Calculate stressed metrics
     stressed_ecl = stressed_results['ecl_stressed'].sum()
@@ -101,8 +230,7 @@ def generate_scenario_insights(portfolio, df_macro, scenario, baseline_metrics):
     stressed_cet1 = baseline_metrics.get('cet1', 11.2) - (stressed_ecl - baseline_metrics['ecl']) / stressed_rwa * 100
     
     # Calculate CAI
-    latest_base = df_macro.iloc[-1]
-    latest_stress = df_stressed.iloc[-1]
+    latest_stress = df_stressed.iloc[-1].to_dict()
     
     cai_base = baseline_metrics.get('cai', 0.83)
     # Simple CAI approximation for stressed scenario
@@ -117,26 +245,20 @@ def generate_scenario_insights(portfolio, df_macro, scenario, baseline_metrics):
     report.add_metric('RWA', baseline_metrics['rwa'] / 1e9, stressed_rwa / 1e9, unit='B')
     report.add_metric('CET1', baseline_metrics.get('cet1', 11.2), stressed_cet1, unit='%')
     
-    # Add segment-specific metrics
-    for idx, row in stressed_results.iterrows():
-        segment = row['segment']
-        base_ecl = portfolio.exposures.loc[idx, 'ecl_12m']
-        stress_ecl = row['ecl_stressed']
-        ecl_change_pct = (stress_ecl / base_ecl - 1) * 100
-        
-        report.add_metric(
-            f"{segment} ECL",
-            base_ecl / 1e6,
-            stress_ecl / 1e6,
-            unit='M'
-        )
+    # Add segment-specific metrics (stressed rows share the portfolio's segment order)
+    report.add_metrics_bulk(
+        [f"{segment} ECL" for segment in stressed_results['segment']],
+        portfolio.exposures['ecl_12m'].to_numpy() / 1e6,
+        stressed_results['ecl_stressed'].to_numpy() / 1e6,
+        unit='M'
+    )
     
     # Generate narratives
     report.add_narrative(generate_cai_narrative(scenario, cai_base, cai_stress, latest_stress))
     report.add_narrative(generate_ecl_narrative(scenario, baseline_metrics['ecl'], stressed_ecl, stressed_results, portfolio))
     report.add_narrative(generate_capital_narrative(scenario, baseline_metrics.get('cet1', 11.2), stressed_cet1))
     
-    if hasattr(scenario, 'spread_shock'):
+    if scenario.funding_stress:
         report.add_narrative(generate_liquidity_narrative(scenario))
     
     return report
@@ -148,12 +270,9 @@ def generate_cai_narrative(scenario, cai_base, cai_stress, latest_stress):
     
     # Identify main driver
     drivers = []
-    if 'funding_cost' in latest_stress.index:
+    if 'funding_cost' in latest_stress:
         drivers.append("funding cost increase")
-    if hasattr(scenario, 'unemployment_shock') and scenario.unemployment_shock > 0:
-        drivers.append(f"unemployment +{scenario.unemployment_shock}pp")
-    if hasattr(scenario, 'rate_shock') and scenario.rate_shock > 0:
-        drivers.append(f"rates +{scenario.rate_shock*100:.0f}bps")
+    drivers.extend(fmt.format(value) for fmt, value in scenario.narrative_drivers())
     
     drivers_str = " and ".join(drivers) if drivers else "macro deterioration"
     
@@ -165,11 +284,10 @@ def generate_ecl_narrative(scenario, base_ecl, stress_ecl, stressed_results, por
     ecl_change_pct = (stress_ecl / base_ecl - 1) * 100
     
     # Identify segment with largest impact
-    stressed_results = stressed_results.copy()
-    stressed_results['base_ecl'] = portfolio.exposures['ecl_12m']
-    stressed_results['ecl_contrib'] = stressed_results['ecl_stressed'] - stressed_results['base_ecl']
-    top_segment = stressed_results.nlargest(1, 'ecl_contrib')['segment'].values[0]
-    top_contrib = stressed_results['ecl_contrib'].max() / (stress_ecl - base_ecl) * 100
+    ecl_contrib = stressed_results['ecl_stressed'].to_numpy() - portfolio.exposures['ecl_12m'].to_numpy()
+    top = ecl_contrib.argmax()
+    top_segment = stressed_results['segment'].iat[top]
+    top_contrib = ecl_contrib[top] / (stress_ecl - base_ecl) * 100
     
     # LGD vs PD attribution (simplified)
     lgd_contrib = 60  # Assume 60% from LGD in housing-stressed scenarios
@@ -184,12 +302,7 @@ def generate_capital_narrative(scenario, base_cet1, stress_cet1):
     buffer_to_min = stress_cet1 - 4.5  # Minimum CET1
     buffer_to_target = stress_cet1 - 10.5  # Target with buffers
     
-    if buffer_to_target < 1.0:
-        urgency = "threshold management or RWA optimization required"
-    elif buffer_to_target < 2.0:
-        urgency = "headroom narrows, monitor closely"
-    else:
-        urgency = "adequate buffer maintained"
+    urgency = URGENCY_LABELS[bisect_right(URGENCY_THRESHOLDS, buffer_to_target)]
     
     return f"CET1 compresses {abs(cet1_change):.1f}pp under stress; headroom to regulatory minimum {buffer_to_min:.1f}pp, to target {buffer_to_target:.1f}pp — {urgency}."
 
@@ -198,15 +311,7 @@ def generate_liquidity_narrative(scenario):
     """Generate liquidity-focused narrative"""
     spread_shock = getattr(scenario, 'spread_shock', 0) * 100
     
-    if spread_shock > 50:
-        lcr_impact = "dips below 1.0"
-        risk_level = "elevated short-term liquidity risk"
-    elif spread_shock > 25:
-        lcr_impact = "approaches floor"
-        risk_level = "moderate liquidity pressure"
-    else:
-        lcr_impact = "remains adequate"
-        risk_level = "limited liquidity stress"
+    lcr_impact, risk_level = LIQUIDITY_LEVELS[bisect_left(LIQUIDITY_THRESHOLDS, spread_shock)]
     
     return f"LCR proxy {lcr_impact} under +{spread_shock:.0f}bps funding spread shock, implying {risk_level}."
 
@@ -225,19 +330,19 @@ def format_comparison_table(reports: List[ScenarioReport]) -> pd.DataFrame:
         return pd.DataFrame()
     
     # Extract common metrics
-    metrics = list(reports[0].metrics.keys())
+    metrics = list(reports[0]._names)
+    
+    cell = "{:.2f}{} ({:+.1f}%)"
     
     data = {'Metric': metrics}
     for report in reports:
-        col_name = report.scenario_name
-        values = []
+        index = report._index
+        scenario, unit, delta_pct = report._scenario, report._unit, report._delta_pct
+        column = []
         for metric in metrics:
-            if metric in report.metrics:
-                val = report.metrics[metric]
-                values.append(f"{val['scenario']:.2f}{val['unit']} ({val['delta_pct']:+.1f}%)")
-            else:
-                values.append('—')
-        data[col_name] = values
+            i = index.get(metric)
+            column.append('—' if i is None else cell.format(scenario[i], unit[i], delta_pct[i]))
+        data[report.scenario_name] = column
     
     return pd.DataFrame(data)
 
@@ -248,52 +353,31 @@ def generate_narrative(scenario_name: str, metrics: Dict[str, Any]) -> str:
     
     Template-based generation for quick insights
     """
-    narrative = f"### {scenario_name} Scenario\n\n"
-    
     # Extract key metrics
     cai_change = metrics.get('cai_change_pct', 0)
     ecl_change = metrics.get('ecl_change_pct', 0)
     cet1_change = metrics.get('cet1_change_pp', 0)
     
     # Severity assessment
-    if abs(ecl_change) > 50:
-        severity = "Severe"
-    elif abs(ecl_change) > 25:
-        severity = "Moderate"
-    else:
-        severity = "Mild"
+    severity = SEVERITY_LABELS[bisect_left(SEVERITY_THRESHOLDS, abs(ecl_change))]
     
-    narrative += f"**Severity:** {severity} ({ecl_change:+.1f}% ECL impact)\n\n"
+    parts = [NARRATIVE_HEADER.format(
+        scenario_name=scenario_name, severity=severity, ecl_change=ecl_change
+    )]
     
     # Key drivers
-    narrative += "**Key Drivers:**\n"
-    if 'rate_shock' in metrics and metrics['rate_shock'] != 0:
-        narrative += f"- Interest rates: {metrics['rate_shock']:+.0f}bps\n"
-    if 'unemployment_shock' in metrics and metrics['unemployment_shock'] != 0:
-        narrative += f"- Unemployment: {metrics['unemployment_shock']:+.1f}pp\n"
-    if 'housing_shock' in metrics and metrics['housing_shock'] != 0:
-        narrative += f"- Housing prices: {metrics['housing_shock']:+.1f}%\n"
-    
-    narrative += "\n**Impact Summary:**\n"
-    narrative += f"- Credit availability falls {abs(cai_change):.1f}%\n"
-    narrative += f"- Expected credit losses increase {abs(ecl_change):.1f}%\n"
-    narrative += f"- Capital ratio compressed by {abs(cet1_change):.1f}pp\n"
+    for key, template in DRIVER_TEMPLATES:
+        if metrics.get(key, 0) != 0:
+            parts.append(template.format(metrics[key]))
+    
+    parts.append(NARRATIVE_IMPACT.format(
+        cai_change=abs(cai_change), ecl_change=abs(ecl_change), cet1_change=abs(cet1_change)
+    ))
     
     # Management actions
-    narrative += "\n**Recommended Actions:**\n"
-    if abs(ecl_change) > 40:
-        narrative += "- Tighten underwriting standards (LVR/LTI limits)\n"
-        narrative += "- Increase provisions proactively\n"
-        narrative += "- Review and potentially reduce exposures to high-risk segments\n"
-    elif abs(ecl_change) > 20:
-        narrative += "- Monitor credit metrics closely\n"
-        narrative += "- Adjust pricing for risk\n"
-        narrative += "- Maintain elevated provisions\n"
-    else:
-        narrative += "- Continue normal monitoring\n"
-        narrative += "- No immediate action required\n"
-    
-    return narrative
+    parts.append(ACTION_TEMPLATES[bisect_left(ACTION_THRESHOLDS, abs(ecl_change))])
+    
+    return "".join(parts)
 
 
 def create_risk_report(portfolio, df_macro, scenarios, country="Australia"):
@@ -321,30 +405,34 @@ def create_risk_report(portfolio, df_macro, scenarios, country="Australia"):
         'cai': 0.83  # Example
     }
     
-    # Generate reports for each scenario
+    # Generate reports for each scenario, sharing the baseline macro row
+    latest_base = df_macro.iloc[-1].to_dict()
     reports = []
     for scenario in scenarios:
-        report = generate_scenario_insights(portfolio, df_macro, scenario, baseline_metrics)
+        report = generate_scenario_insights(portfolio, df_macro, scenario, baseline_metrics, latest_base)
         reports.append(report)
     
     # Create comparison table
     comparison_table = format_comparison_table(reports)
     
     # Generate summary
-    summary = f"# {country} Credit Risk Scenario Analysis\n\n"
-    summary += f"**Portfolio:** ${portfolio.exposures['total_ead'].sum()/1e9:.1f}B EAD, "
-    summary += f"${baseline_metrics['ecl']/1e9:.2f}B ECL, "
-    summary += f"${baseline_metrics['rwa']/1e9:.1f}B RWA\n\n"
-    summary += f"**Baseline CET1:** {baseline_metrics['cet1']:.1f}%\n\n"
-    
-    summary += "## Scenario Comparison\n\n"
-    summary += comparison_table.to_markdown(index=False)
-    summary += "\n\n"
+    parts = [
+        f"# {country} Credit Risk Scenario Analysis\n\n",
+        f"**Portfolio:** ${portfolio.exposures['total_ead'].sum()/1e9:.1f}B EAD, ",
+        f"${baseline_metrics['ecl']/1e9:.2f}B ECL, ",
+        f"${baseline_metrics['rwa']/1e9:.1f}B RWA\n\n",
+        f"**Baseline CET1:** {baseline_metrics['cet1']:.1f}%\n\n",
+        "## Scenario Comparison\n\n",
+        _fast_markdown(comparison_table),
+        "\n\n"
+    ]
     
     # Add individual scenario summaries
     for report in reports:
-        summary += report.generate_summary()
-        summary += "\n---\n\n"
+        parts.append(report.generate_summary())
+        parts.append("\n---\n\n")
+    
+    summary = "".join(parts)
     
     return {
         'summary': summary,
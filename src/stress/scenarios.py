@@ -2,15 +2,56 @@
 Stress Testing Scenarios
 Implements various macro stress scenarios for capital and credit risk analysis
 """
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
 
+@lru_cache(maxsize=32)
+def _ramp(n, shock, months):
+    """
+    Shock path rising linearly from 0 to shock over `months`, then held
+    Cached across apply() calls, so the returned array is read-only
+    Returns: array of length n
+    """
+    # One ramp array clipped at the shock instead of linspace + pad
+    step = shock / max(min(months, n) - 1, 1)
+    path = np.arange(n, dtype=np.float64) * step
+    np.clip(path, min(0, shock), max(0, shock), out=path)
+    path.flags.writeable = False
+    return path
+
+
+def _apply_shocks(df, additive=(), factors=()):
+    """
+    Shift and scale the columns of df present in the shock dicts, in place
+    
+    additive / factors: {column: scalar or length-n path}
+    Each kind is applied to all its columns as one (n, k) block operation
+    """
+    n = len(df)
+    for shocks, op in ((additive, np.add), (factors, np.multiply)):
+        cols = [col for col in shocks if col in df.columns]
+        if cols:
+            shock_matrix = np.column_stack([np.broadcast_to(shocks[col], (n,)) for col in cols])
+            df[cols] = op(df[cols].to_numpy(), shock_matrix)
+    return df
+
+
 class StressScenario:
     """
     Base class for stress scenarios
     """
     
+    # Scenarios that stress bank funding get a liquidity narrative
+    funding_stress = False
+    
+    # Opt-in: the last stressed row depends only on the last base row and
+    # reaches the full shock within two rows, so only_latest may stress the
+    # tail alone. Subclasses with path-dependent shocks leave this False
+    path_independent = False
+    
     def __init__(self, name, description):
         self.name = name
         self.description = description
@@ -21,28 +62,59 @@ class StressScenario:
         Apply scenario shocks to baseline data
         Returns: DataFrame with stressed variables
         """
-        df_stressed = df_base.copy()
+        df_stressed = df_base.copy(deep=False)
         
+        # Partition shocks so each kind is applied to all its columns at once
+        additive, growth = {}, {}
         for var, shock in self.shocks.items():
-            if var in df_stressed.columns:
-                if isinstance(shock, dict):
-                    # Time-varying shock
-                    if 'instant' in shock:
-                        df_stressed[var] = df_stressed[var] + shock['instant']
-                    elif 'growth' in shock:
-                        # Apply growth rate
-                        df_stressed[var] = df_stressed[var] * (1 + shock['growth'])
-                else:
-                    # Simple additive shock
-                    df_stressed[var] = df_stressed[var] + shock
+            if isinstance(shock, dict):
+                # Time-varying shock
+                if 'instant' in shock:
+                    additive[var] = shock['instant']
+                elif 'growth' in shock:
+                    # Apply growth rate
+                    growth[var] = 1 + shock['growth']
+            else:
+                # Simple additive shock
+                additive[var] = shock
+        
+        if additive:
+            shifts = pd.Series(additive, dtype=float)
+            cols = df_stressed.columns.intersection(shifts.index)
+            df_stressed[cols] = df_stressed[cols] + shifts[cols]
+        if growth:
+            factors = pd.Series(growth, dtype=float)
+            cols = df_stressed.columns.intersection(factors.index)
+            df_stressed[cols] = df_stressed[cols] * factors[cols]
         
         return df_stressed
     
+    def narrative_drivers(self):
+        """
+        Shock drivers to cite in the CAI narrative
+        Returns: list of (format string, value) pairs
+        """
+        return []
+    
     def __repr__(self):
         return f"StressScenario('{self.name}')"
 
 
-class TighteningScenario(StressScenario):
+class _RateShockDrivers:
+    """
+    Narrative drivers for scenarios with unemployment_shock and rate_shock
+    """
+    
+    def narrative_drivers(self):
+        drivers = []
+        if self.unemployment_shock > 0:
+            drivers.append(("unemployment +{}pp", self.unemployment_shock))
+        if self.rate_shock > 0:
+            drivers.append(("rates +{:.0f}bps", self.rate_shock * 100))
+        return drivers
+
+
+class TighteningScenario(_RateShockDrivers, StressScenario):
     """
     Monetary Tightening Scenario
     - Interest rates surge +200 bps
@@ -51,6 +123,8 @@ class TighteningScenario(StressScenario):
     - Credit growth slows significantly
     """
     
+    path_independent = True
+    
     def __init__(self, rate_shock=2.0, unemployment_shock=2.0, housing_shock=-10.0):
         super().__init__(
             name="Monetary Tightening",
@@ -65,48 +139,34 @@ class TighteningScenario(StressScenario):
         """
         Apply tightening scenario
         """
-        df_stressed = df_base.copy()
-        
-        # Rate shock (instantaneous)
-        if 'cash_rate' in df_stressed.columns:
-            df_stressed['cash_rate'] = df_stressed['cash_rate'] + self.rate_shock
-        if 'fed_funds_rate' in df_stressed.columns:
-            df_stressed['fed_funds_rate'] = df_stressed['fed_funds_rate'] + self.rate_shock
-        
-        # Unemployment shock (gradual over 12 months)
+        df_stressed = df_base.copy(deep=False)
         n = len(df_stressed)
-        unemployment_path = np.linspace(0, self.unemployment_shock, min(12, n))
-        unemployment_path = np.concatenate([unemployment_path, 
-                                           np.full(n - len(unemployment_path), self.unemployment_shock)])
         
-        if 'unemployment_rate' in df_stressed.columns:
-            df_stressed['unemployment_rate'] = df_stressed['unemployment_rate'] + unemployment_path
+        additive = {
+            # Rate shock (instantaneous)
+            'cash_rate': self.rate_shock,
+            'fed_funds_rate': self.rate_shock,
+            # Unemployment shock (gradual over 12 months)
+            'unemployment_rate': _ramp(n, self.unemployment_shock, 12),
+            # Spread widens
+            'bbsw_spread': 0.5,
+            'baa_spread': 0.5
+        }
         
         # Housing shock (gradual decline over 24 months)
-        if 'housing_price_index' in df_stressed.columns or 'housing_price_growth' in df_stressed.columns:
-            housing_path = np.linspace(0, self.housing_shock, min(24, n))
-            housing_path = np.concatenate([housing_path,
-                                          np.full(n - len(housing_path), self.housing_shock)])
-            
-            if 'housing_price_growth' in df_stressed.columns:
-                df_stressed['housing_price_growth'] = df_stressed['housing_price_growth'] + housing_path
+        if 'housing_price_growth' in df_stressed.columns:
+            additive['housing_price_growth'] = _ramp(n, self.housing_shock, 24)
         
         # Credit growth slows (falls by 50%)
-        if 'credit_growth_housing' in df_stressed.columns:
-            df_stressed['credit_growth_housing'] = df_stressed['credit_growth_housing'] * 0.5
-        if 'credit_growth' in df_stressed.columns:
-            df_stressed['credit_growth'] = df_stressed['credit_growth'] * 0.5
+        factors = {
+            'credit_growth_housing': 0.5,
+            'credit_growth': 0.5
+        }
         
-        # Spread widens
-        if 'bbsw_spread' in df_stressed.columns:
-            df_stressed['bbsw_spread'] = df_stressed['bbsw_spread'] + 0.5
-        if 'baa_spread' in df_stressed.columns:
-            df_stressed['baa_spread'] = df_stressed['baa_spread'] + 0.5
-        
-        return df_stressed
+        return _apply_shocks(df_stressed, additive, factors)
 
 
-class SoftLandingScenario(StressScenario):
+class SoftLandingScenario(_RateShockDrivers, StressScenario):
     """
     Soft Landing Scenario
     - Rates rise modestly +50 bps
@@ -115,6 +175,8 @@ class SoftLandingScenario(StressScenario):
     - Credit growth moderates
     """
     
+    path_independent = True
+    
     def __init__(self, rate_shock=0.5, unemployment_shock=0.5, housing_shock=0.0):
         super().__init__(
             name="Soft Landing",
@@ -129,7 +191,7 @@ class SoftLandingScenario(StressScenario):
         """
         Apply soft landing scenario
         """
-        df_stressed = df_base.copy()
+        df_stressed = df_base.copy(deep=False)
         
         # Modest rate increase
         if 'cash_rate' in df_stressed.columns:
@@ -163,6 +225,9 @@ class FundingShockScenario(StressScenario):
     - SME lending falls sharply
     """
     
+    funding_stress = True
+    path_independent = True
+    
     def __init__(self, spread_shock=0.75, credit_shock=-15):
         super().__init__(
             name="Funding Shock",
@@ -176,7 +241,7 @@ class FundingShockScenario(StressScenario):
         """
         Apply funding shock scenario
         """
-        df_stressed = df_base.copy()
+        df_stressed = df_base.copy(deep=False)
         
         # Spread shock
         if 'bbsw_spread' in df_stressed.columns:
@@ -213,6 +278,8 @@ class SevereRecessionScenario(StressScenario):
     - Credit markets freeze
     """
     
+    path_independent = True
+    
     def __init__(self):
         super().__init__(
             name="Severe Recession",
@@ -223,25 +290,17 @@ class SevereRecessionScenario(StressScenario):
         """
         Apply severe recession scenario
         """
-        df_stressed = df_base.copy()
+        df_stressed = df_base.copy(deep=False)
         n = len(df_stressed)
         
         # Unemployment spikes to 10%
-        unemployment_path = np.linspace(0, 5, min(12, n))
-        unemployment_path = np.concatenate([unemployment_path,
-                                           np.full(n - len(unemployment_path), 5)])
-        
         if 'unemployment_rate' in df_stressed.columns:
-            df_stressed['unemployment_rate'] = df_stressed['unemployment_rate'] + unemployment_path
+            df_stressed['unemployment_rate'] = df_stressed['unemployment_rate'] + _ramp(n, 5, 12)
             df_stressed['unemployment_rate'] = np.minimum(df_stressed['unemployment_rate'], 12)
         
-        # Housing crash -25%
-        housing_path = np.linspace(0, -25, min(18, n))
-        housing_path = np.concatenate([housing_path,
-                                      np.full(n - len(housing_path), -25)])
-        
+        # Housing crash -25% (copied: the cached path is read-only)
         if 'housing_price_growth' in df_stressed.columns:
-            df_stressed['housing_price_growth'] = housing_path
+            df_stressed['housing_price_growth'] = _ramp(n, -25, 18).copy()
         
         # Rates cut aggressively
         if 'cash_rate' in df_stressed.columns:
@@ -269,6 +328,8 @@ class CustomScenario(StressScenario):
     Custom scenario with user-defined shocks
     """
     
+    path_independent = True
+    
     def __init__(self, name, shocks):
         """
         shocks: dict of {variable: shock_value}
@@ -281,49 +342,53 @@ class CustomScenario(StressScenario):
         """
         Apply custom shocks
         """
-        df_stressed = df_base.copy()
+        df_stressed = df_base.copy(deep=False)
         
-        for var, shock in self.custom_shocks.items():
-            if var in df_stressed.columns:
-                df_stressed[var] = df_stressed[var] + shock
+        # Shift all shocked columns in one aligned frame operation
+        shocks = pd.Series(self.custom_shocks, dtype=float)
+        cols = df_stressed.columns.intersection(shocks.index)
+        df_stressed[cols] = df_stressed[cols] + shocks[cols]
         
         return df_stressed
 
 
-def apply_scenario_to_portfolio(portfolio, scenario, df_macro):
+def apply_scenario_to_portfolio(portfolio, scenario, df_macro, latest_base=None, only_latest=False):
     """
     Apply macro scenario to portfolio and recalculate risk metrics
     
     portfolio: Portfolio object from modeling.portfolio
     scenario: StressScenario object
     df_macro: DataFrame with macro variables
+    latest_base: Optional last row of df_macro as a dict, when the
+                 caller applies several scenarios to the same data
+    only_latest: Stress just the tail of df_macro when the caller needs
+                 the metrics but not the full stressed path; honoured only
+                 for scenarios with path_independent set
     
     Returns: Stressed portfolio metrics
     """
-    from ..modeling.core import PDModel, LGDModel
-    
-    # Apply scenario to macro data
-    df_stressed = scenario.apply(df_macro)
-    
-    # Get latest stressed values
-    latest = df_stressed.iloc[-1]
-    
-    # Calculate stressed PD based on macro variables
-    pd_model = PDModel()
+    # Apply scenario to macro data. For path-independent scenarios the last
+    # two rows reproduce the final stressed row of the full horizon
+    if only_latest and scenario.path_independent:
+        df_stressed = scenario.apply(df_macro.iloc[-2:])
+    else:
+        df_stressed = scenario.apply(df_macro)
     
-    # For each segment, apply stressed PD/LGD
-    stressed_portfolio = portfolio.exposures.copy()
+    # Get latest stressed and baseline values
+    latest = df_stressed.iloc[-1].to_dict()
+    if latest_base is None:
+        latest_base = df_macro.iloc[-1].to_dict()
     
     # Estimate PD impact
     if 'unemployment_rate' in latest:
-        unemployment_impact = (latest['unemployment_rate'] - df_macro.iloc[-1]['unemployment_rate']) / 2.0
+        unemployment_impact = (latest['unemployment_rate'] - latest_base['unemployment_rate']) / 2.0
         pd_multiplier = 1 + unemployment_impact * 0.3  # 30% PD increase per 2pp unemployment
     else:
         pd_multiplier = 1.0
     
     # Estimate LGD impact (from housing price changes)
     if 'housing_price_growth' in latest:
-        housing_impact = (latest['housing_price_growth'] - df_macro.iloc[-1].get('housing_price_growth', 0)) / 10
+        housing_impact = (latest['housing_price_growth'] - latest_base.get('housing_price_growth', 0)) / 10
         lgd_multiplier = 1 - housing_impact * 0.1  # 10% LGD increase per 10% house price fall
         lgd_multiplier = np.clip(lgd_multiplier, 0.8, 1.5)
     else:
@@ -348,40 +413,48 @@ def compare_scenarios(portfolio, scenarios, df_macro):
     
     Returns: DataFrame with comparison metrics
     """
-    results = []
+    # Column arrays filled by index, baseline in row 0
+    n = len(scenarios) + 1
+    names = ['Baseline'] + [scenario.name for scenario in scenarios]
+    total_ecl = np.empty(n)
+    total_rwa = np.empty(n)
+    cet1_required = np.empty(n)
+    ecl_change = np.zeros(n)
+    rwa_change = np.zeros(n)
     
     # Baseline
     portfolio.calculate_ecl()
     portfolio.calculate_rwa()
     capital_base = portfolio.calculate_capital()
+    base_ecl = portfolio.exposures['ecl_12m'].sum()
+    base_rwa = capital_base['total_rwa']
+    latest_base = df_macro.iloc[-1].to_dict()
     
-    results.append({
-        'Scenario': 'Baseline',
-        'Total ECL': portfolio.exposures['ecl_12m'].sum(),
-        'Total RWA': portfolio.exposures['rwa'].sum(),
-        'CET1 Required': capital_base['cet1_required'],
-        'ECL Change (%)': 0,
-        'RWA Change (%)': 0
-    })
+    total_ecl[0] = base_ecl
+    total_rwa[0] = base_rwa
+    cet1_required[0] = capital_base['cet1_required']
     
     # Stressed scenarios
-    for scenario in scenarios:
-        stressed, _ = apply_scenario_to_portfolio(portfolio, scenario, df_macro)
-        
-        ecl_stressed = stressed['ecl_stressed'].sum()
-        rwa_stressed = stressed['rwa_stressed'].sum()
-        capital_stressed = rwa_stressed * 0.105
+    for i, scenario in enumerate(scenarios, 1):
+        stressed, _ = apply_scenario_to_portfolio(
+            portfolio, scenario, df_macro, latest_base, only_latest=True
+        )
         
-        results.append({
-            'Scenario': scenario.name,
-            'Total ECL': ecl_stressed,
-            'Total RWA': rwa_stressed,
-            'CET1 Required': capital_stressed,
-            'ECL Change (%)': (ecl_stressed / portfolio.exposures['ecl_12m'].sum() - 1) * 100,
-            'RWA Change (%)': (rwa_stressed / portfolio.exposures['rwa'].sum() - 1) * 100
-        })
-    
-    return pd.DataFrame(results)
+        total_ecl[i] = stressed['ecl_stressed'].sum()
+        total_rwa[i] = stressed['rwa_stressed'].sum()
+        cet1_required[i] = total_rwa[i] * 0.105
+    
+    ecl_change[1:] = (total_ecl[1:] / base_ecl - 1) * 100
+    rwa_change[1:] = (total_rwa[1:] / base_rwa - 1) * 100
+    
+    return pd.DataFrame({
+        'Scenario': names,
+        'Total ECL': total_ecl,
+        'Total RWA': total_rwa,
+        'CET1 Required': cet1_required,
+        'ECL Change (%)': ecl_change,
+        'RWA Change (%)': rwa_change
+    })
 
 
 if __name__ == "__main__":
@@ -411,14 +484,15 @@ if __name__ == "__main__":
     print("SCENARIO DEFINITIONS")
     print("-"*70)
     
+    base = df_macro.iloc[-1].to_dict()
     for scenario in scenarios:
         print(f"\n{scenario.name}:")
         print(f"  {scenario.description}")
-        df_stressed = scenario.apply(df_macro)
-        print(f"  Unemployment: {df_macro.iloc[-1]['unemployment_rate']:.1f}% → {df_stressed.iloc[-1]['unemployment_rate']:.1f}%")
-        print(f"  Cash Rate: {df_macro.iloc[-1]['cash_rate']:.2f}% → {df_stressed.iloc[-1]['cash_rate']:.2f}%")
-        if 'housing_price_growth' in df_stressed.columns:
-            print(f"  Housing Growth: {df_macro.iloc[-1]['housing_price_growth']:.1f}% → {df_stressed.iloc[-1]['housing_price_growth']:.1f}%")
+        stressed = scenario.apply(df_macro).iloc[-1].to_dict()
+        print(f"  Unemployment: {base['unemployment_rate']:.1f}% → {stressed['unemployment_rate']:.1f}%")
+        print(f"  Cash Rate: {base['cash_rate']:.2f}% → {stressed['cash_rate']:.2f}%")
+        if 'housing_price_growth' in stressed:
+            print(f"  Housing Growth: {base['housing_price_growth']:.1f}% → {stressed['housing_price_growth']:.1f}%")
     
     print("\n" + "="*70)
     print("Run with portfolio data to see full stress impact on ECL and RWA")
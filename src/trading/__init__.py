@@ -6,18 +6,24 @@ Sophisticated hedging recommendations for credit portfolios
 from .hedging import (
     HedgingStrategy,
     generate_hedging_recommendations,
+    generate_hedging_recommendations_batch,
     CDSHedgeAnalyzer,
     CrossAssetHedger,
     calculate_hedge_ratio,
-    estimate_basis_risk
+    calculate_hedge_ratios,
+    estimate_basis_risk,
+    estimate_basis_risk_df
 )
 
 __all__ = [
     'HedgingStrategy',
     'generate_hedging_recommendations',
+    'generate_hedging_recommendations_batch',
     'CDSHedgeAnalyzer',
     'CrossAssetHedger',
     'calculate_hedge_ratio',
-    'estimate_basis_risk'
+    'calculate_hedge_ratios',
+    'estimate_basis_risk',
+    'estimate_basis_risk_df'
 ]
 
@@ -5,26 +5,150 @@ Incorporates market microstructure, basis risk, and execution considerations
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Any
+import heapq
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 
+# Compiled batch hedge ratio kernel is used when numba is installed
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
 
-@dataclass
+
+# Values of the categorical HedgingStrategy fields, in increasing order
+RISK_LEVELS = ("None", "Negligible", "Low", "Medium", "High")
+TIME_HORIZONS = ("Immediate", "1-2 weeks", "2-3 weeks", "1 month+")
+
+# Column dtypes for the categorical fields in batch recommendation frames
+STRATEGY_CATEGORIES = {
+    'name': 'category',
+    'direction': 'category',
+    'basis_risk': pd.CategoricalDtype(RISK_LEVELS, ordered=True),
+    'market_impact': pd.CategoricalDtype(RISK_LEVELS, ordered=True),
+    'time_horizon': pd.CategoricalDtype(TIME_HORIZONS, ordered=True)
+}
+
+
+def _basis_risk(tracking_error, worst_case, r_squared):
+    return MappingProxyType(
+        {'tracking_error': tracking_error, 'worst_case': worst_case, 'r_squared': r_squared}
+    )
+
+
+# Basis risk by (hedge type, scenario), built once and shared read-only
+BASIS_RISK_TABLE = {
+    ('index_cds', 'Tightening'): _basis_risk(0.15, 0.25, 0.75),
+    ('index_cds', 'Soft Landing'): _basis_risk(0.10, 0.18, 0.82),
+    ('index_cds', 'Funding Shock'): _basis_risk(0.20, 0.35, 0.65),
+    ('corporate_bond', 'Tightening'): _basis_risk(0.08, 0.15, 0.90),
+    ('corporate_bond', 'Soft Landing'): _basis_risk(0.05, 0.10, 0.93),
+    ('corporate_bond', 'Funding Shock'): _basis_risk(0.25, 0.45, 0.55),
+    ('equity', 'Tightening'): _basis_risk(0.35, 0.60, 0.45),
+    ('equity', 'Soft Landing'): _basis_risk(0.25, 0.40, 0.60),
+    ('equity', 'Funding Shock'): _basis_risk(0.50, 0.80, 0.30)
+}
+DEFAULT_BASIS_RISK = _basis_risk(0.20, 0.40, 0.70)
+
+# Same table as a frame indexed by (hedge type, scenario), for batch lookups
+BASIS_RISK_FRAME = pd.DataFrame.from_dict(
+    {key: dict(risk) for key, risk in BASIS_RISK_TABLE.items()}, orient='index'
+)
+
+
+# Hedge notional per unit of position notional, shared by the scalar and batch recommenders
+INDEX_HEDGE_RATIO = 0.85  # Typical single-name to index beta
+BOND_HEDGE_RATIO = 1.67  # 40% recovery -> $1.67 bond per $1 CDS
+EQUITY_HEDGE_RATIO = 0.40  # Merton hedge ratio: dCDS/dEquity ~= -0.40 for IG names
+UNWIND_DAYS = 10  # Closeout spread over 10 trading days
+SWAPTION_STRIKE_RATIO = 0.90  # 10% OTM put
+RATES_HEDGE_RATIO = 5.0  # 5yr duration DV01 (0.05) converted to notional (x100)
+FX_HEDGE_RATIO = 0.5  # Assume 50% of the exposure is FX-sensitive
+
+
+def _profile(name, direction, liquidity_score, basis_risk, market_impact, time_horizon,
+             crush_avoidance_rating):
+    return MappingProxyType({
+        'name': name, 'direction': direction, 'liquidity_score': liquidity_score,
+        'basis_risk': basis_risk, 'market_impact': market_impact,
+        'time_horizon': time_horizon, 'crush_avoidance_rating': crush_avoidance_rating
+    })
+
+
+# Fixed HedgingStrategy fields of each recommender, shared read-only
+STRATEGY_PROFILES = {
+    'index': _profile("Credit Index Hedge", "Sell Protection", 9, "Medium", "Low", "Immediate", 10),
+    'bond': _profile("Corporate Bond Hedge", "Buy", 6, "Low", "Medium", "1-2 weeks", 7),
+    'equity': _profile("Equity Cross-Hedge", "Buy", 10, "High", "Low", "1-2 weeks", 10),
+    'closeout': _profile("Gradual Unwind (Patient Approach)", "Sell Protection", 4, "None", "Low",
+                         "2-3 weeks", 8),
+    'options': _profile("CDS Put Swaption", "Sell", 3, "Low", "Low", "Immediate", 9),
+    'rates': _profile("Interest Rate Hedge (Duration Overlay)", "Receive Fixed", 10, "Medium",
+                      "Negligible", "Immediate", 10),
+    'fx': _profile("FX Hedge (Currency Overlay)", "Sell Foreign Currency", 9, "Low", "Negligible",
+                   "Immediate", 10)
+}
+
+
+@dataclass(frozen=True, init=False)
 class HedgingStrategy:
     """Container for a hedging strategy recommendation"""
+    
+    # Declared by hand rather than dataclass(slots=True), which needs 3.10+.
+    # The template slots are not fields, so asdict() and == see only rationale
+    __slots__ = (
+        'name', 'instrument', 'direction', 'notional', 'rationale',
+        'execution_approach', 'liquidity_score', 'basis_risk', 'market_impact',
+        'time_horizon', 'pros', 'cons', 'crush_avoidance_rating',
+        'rationale_template', 'rationale_args'
+    )
+    
     name: str
     instrument: str
     direction: str  # "Buy" or "Sell"
     notional: float
-    rationale: str
+    rationale: str  # Formatted from rationale_template on first access when not given
     execution_approach: str
     liquidity_score: int  # 1-10, higher = more liquid
-    basis_risk: str  # "Low", "Medium", "High"
-    market_impact: str  # "Low", "Medium", "High"
-    time_horizon: str  # "Immediate", "1-2 weeks", "1 month+"
-    pros: List[str]
-    cons: List[str]
+    basis_risk: str  # One of RISK_LEVELS
+    market_impact: str  # One of RISK_LEVELS
+    time_horizon: str  # One of TIME_HORIZONS
+    pros: Tuple[str, ...]
+    cons: Tuple[str, ...]
     crush_avoidance_rating: int  # 1-10, higher = better at avoiding crush
+    
+    def __init__(self, name, instrument, direction, notional, rationale=None,
+                 execution_approach=None, liquidity_score=None, basis_risk=None,
+                 market_impact=None, time_horizon=None, pros=(), cons=(),
+                 crush_avoidance_rating=None, *, rationale_template=None, rationale_args=()):
+        """
+        rationale: Rationale text; when omitted, rationale_template is
+                   formatted with rationale_args the first time it is read
+        """
+        if rationale is None and rationale_template is None:
+            raise TypeError("HedgingStrategy needs rationale or rationale_template")
+        values = locals()
+        for field_name in self.__slots__:
+            if field_name != 'rationale' or rationale is not None:
+                object.__setattr__(self, field_name, values[field_name])
+    
+    def __getattr__(self, name):
+        # Only reached for an unset slot: the rationale is formatted and cached here
+        if name != 'rationale':
+            raise AttributeError(name)
+        text = self.rationale_template.format(*self.rationale_args)
+        object.__setattr__(self, 'rationale', text)
+        return text
+    
+    # Pickle and copy restore slots through setattr, which frozen forbids
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
 
 
 class CDSHedgeAnalyzer:
@@ -33,6 +157,76 @@ class CDSHedgeAnalyzer:
     Focuses on avoiding 'crush' scenarios where hedging moves the market
     """
     
+    # Pros and cons per recommender, shared by every strategy built
+    _INDEX_PROS = (
+        "Deepest liquidity in credit markets—execute $100M+ blocks instantly",
+        "Index spread is average of 125 names; diversifies idiosyncratic risk",
+        "Transparent pricing; tight bid-ask spreads (0.25-0.5bp)",
+        "No single-name alpha signal leak—you're not revealing which name you own",
+        "Can re-hedge dynamically as single-name spread moves"
+    )
+    _INDEX_CONS = (
+        "Beta mismatch: index beta to single-name typically 0.7-0.9 (basis risk)",
+        "Systemic events (market-wide spread moves) hedged, but not idiosyncratic",
+        "Index rolls every 6 months—requires rebalancing to new series",
+        "If your single-name is excluded from index (downgrade/default), hedge fails"
+    )
+    _BOND_PROS = (
+        "Direct hedge—same reference entity, tight basis to CDS",
+        "Bond market may be less transparent; dealers less likely to front-run",
+        "Coupon income offsets CDS premium payment (carry positive)",
+        "No counterparty risk on bond (vs. CDS counterparty credit risk)",
+        "Regulatory capital treatment may be favorable (banking book asset)"
+    )
+    _BOND_CONS = (
+        "Less liquid than index CDS—harder to execute $100M+ without moving market",
+        "Bid-ask spread wider (10-30bp vs. <1bp for index CDS)",
+        "Basis risk: bond-CDS basis can widen/tighten independently of credit (technical factors)",
+        "Recovery rate mismatch—need to calculate correct hedge ratio",
+        "If bond trades special (repo squeeze), basis hedge breaks down"
+    )
+    _EQUITY_PROS = (
+        "ZERO credit market impact—executed in completely separate market (equity exchange)",
+        "Highest liquidity—can trade $100M+ in most large-cap names without issue",
+        "No signal leak to credit traders; maintains confidentiality of CDS position",
+        "Can use options for capital efficiency (buy ATM calls = synthetic long)",
+        "Dynamic delta—equity responds faster than bonds/CDS to news"
+    )
+    _EQUITY_CONS = (
+        "High basis risk—correlation not perfect; equity driven by growth, CDS by credit",
+        "Equity volatility >> credit volatility; requires frequent rebalancing",
+        "Idiosyncratic factors: equity can fall while credit improves (e.g., margin compression)",
+        "Merton hedge ratio unstable—changes with leverage, volatility, equity price",
+        "Regulatory capital: equity held in trading book (higher RWA than bonds)"
+    )
+    _CLOSEOUT_PROS = (
+        "Perfect hedge—same instrument, zero basis risk",
+        "Small clips reduce market impact; spreads stay stable",
+        "Dealer rotation and platform diversification prevent information aggregation",
+        "Flexibility to pause if spreads move against you; wait for better levels",
+        "Can use algo tools (VWAP-style for CDS) if available on electronic platforms"
+    )
+    _CLOSEOUT_CONS = (
+        "Time risk: position remains open for 2-3 weeks; market can move against you",
+        "Execution risk: need consistent liquidity; illiquid names can't support daily clips",
+        "Transaction costs: 10 trades = 10x bid-ask spread drag (vs. 1 block trade)",
+        "Operational complexity: managing multiple dealers, platforms, settlement",
+        "If market learns you're unwinding (dealer gossip), spread can still tighten"
+    )
+    _OPTIONS_PROS = (
+        "Premium income offsets potential CDS mark-to-market loss",
+        "Non-linear payoff: capped downside if spreads tighten dramatically",
+        "OTC structure allows customization (strike, tenor, notional)",
+        "Smaller notional traded vs. outright CDS hedge (less market impact)"
+    )
+    _OPTIONS_CONS = (
+        "Illiquid market—only available for large, liquid reference entities",
+        "Wide bid-ask on premium (5-10bp spread); difficult to price",
+        "Upfront cost: premium paid reduces P&L if spreads don't tighten",
+        "Counterparty risk: need ISDA and CSA with dealers",
+        "Complex Greeks: vega, theta require active management"
+    )
+    
     def __init__(self, position_size: float, entity: str, current_spread: float):
         """
         Args:
@@ -43,52 +237,41 @@ class CDSHedgeAnalyzer:
         self.position_size = position_size
         self.entity = entity
         self.current_spread = current_spread
+        
+        # Derived hedge sizes, shared by the recommenders
+        # Index based on entity region
+        self._index = "CDX.NA.IG" if "US" in entity or "North America" in entity else "iTraxx Europe"
+        self._index_notional = position_size * INDEX_HEDGE_RATIO
+        self._bond_notional = position_size * BOND_HEDGE_RATIO
+        self._equity_notional = position_size * EQUITY_HEDGE_RATIO
+        self._daily_unwind = position_size / UNWIND_DAYS
+        self._swaption_strike = current_spread * SWAPTION_STRIKE_RATIO
     
     def recommend_index_hedge(self) -> HedgingStrategy:
         """
         Recommend credit index hedge (CDX/iTraxx)
         The go-to strategy for large positions
         """
-        # Determine appropriate index based on entity
-        index = "CDX.NA.IG" if "US" in self.entity or "North America" in self.entity else "iTraxx Europe"
-        
-        # Beta adjustment for hedge ratio
-        hedge_ratio = 0.85  # Typical single-name to index beta
-        hedge_notional = self.position_size * hedge_ratio
+        index = self._index
+        hedge_notional = self._index_notional
         
         return HedgingStrategy(
-            name="Credit Index Hedge",
             instrument=f"{index} Index CDS",
-            direction="Sell Protection",
             notional=hedge_notional,
-            rationale=(
-                f"Sell {hedge_notional:.0f}M of {index} to hedge {self.position_size:.0f}M "
-                f"single-name long CDS exposure. Index markets are 10-20x more liquid than "
-                f"single-name, allowing execution without crushing spreads."
+            rationale_template=(
+                "Sell {:.0f}M of {} to hedge {:.0f}M "
+                "single-name long CDS exposure. Index markets are 10-20x more liquid than "
+                "single-name, allowing execution without crushing spreads."
             ),
+            rationale_args=(hedge_notional, index, self.position_size),
             execution_approach=(
                 "Execute via electronic platform (Bloomberg SEF, Tradeweb, MarketAxess) in "
                 "single trade or 2-3 clips over one session. Market depth supports $500M+ "
                 "without material spread movement (<0.5bp slip)."
             ),
-            liquidity_score=9,
-            basis_risk="Medium",
-            market_impact="Low",
-            time_horizon="Immediate",
-            pros=[
-                "Deepest liquidity in credit markets—execute $100M+ blocks instantly",
-                "Index spread is average of 125 names; diversifies idiosyncratic risk",
-                "Transparent pricing; tight bid-ask spreads (0.25-0.5bp)",
-                "No single-name alpha signal leak—you're not revealing which name you own",
-                "Can re-hedge dynamically as single-name spread moves"
-            ],
-            cons=[
-                "Beta mismatch: index beta to single-name typically 0.7-0.9 (basis risk)",
-                "Systemic events (market-wide spread moves) hedged, but not idiosyncratic",
-                "Index rolls every 6 months—requires rebalancing to new series",
-                "If your single-name is excluded from index (downgrade/default), hedge fails"
-            ],
-            crush_avoidance_rating=10
+            pros=self._INDEX_PROS,
+            cons=self._INDEX_CONS,
+            **STRATEGY_PROFILES['index']
         )
     
     def recommend_bond_hedge(self, bond_available: bool = True) -> HedgingStrategy:
@@ -100,43 +283,25 @@ class CDSHedgeAnalyzer:
         
         # Bond notional slightly higher due to recovery-adjusted equivalence
         # CDS protects $1 notional; bond pays (1 - Recovery) on default
-        # Assume 40% recovery -> need $1.67 bond per $1 CDS
-        bond_notional = self.position_size * 1.67
+        bond_notional = self._bond_notional
         
         return HedgingStrategy(
-            name="Corporate Bond Hedge",
             instrument=f"{self.entity} Senior Unsecured Bond",
-            direction="Buy",
             notional=bond_notional,
-            rationale=(
-                f"Buy {bond_notional:.0f}M of {self.entity} bonds to hedge {self.position_size:.0f}M "
-                f"long CDS. If credit tightens (CDS loses value), bond price rises, offsetting loss. "
-                f"Recovery adjustment: bond pays (1-R) on default vs. CDS par protection."
+            rationale_template=(
+                "Buy {:.0f}M of {} bonds to hedge {:.0f}M "
+                "long CDS. If credit tightens (CDS loses value), bond price rises, offsetting loss. "
+                "Recovery adjustment: bond pays (1-R) on default vs. CDS par protection."
             ),
+            rationale_args=(bond_notional, self.entity, self.position_size),
             execution_approach=(
                 "Trade via dealer network (2-3 dealers for price competition) or electronic "
                 "bond platforms (MarketAxess, Tradeweb). For $50M+, execute in 2-4 blocks "
                 "over 1-2 days to avoid telegraphing large buy interest."
             ),
-            liquidity_score=6,
-            basis_risk="Low",
-            market_impact="Medium",
-            time_horizon="1-2 weeks",
-            pros=[
-                "Direct hedge—same reference entity, tight basis to CDS",
-                "Bond market may be less transparent; dealers less likely to front-run",
-                "Coupon income offsets CDS premium payment (carry positive)",
-                "No counterparty risk on bond (vs. CDS counterparty credit risk)",
-                "Regulatory capital treatment may be favorable (banking book asset)"
-            ],
-            cons=[
-                "Less liquid than index CDS—harder to execute $100M+ without moving market",
-                "Bid-ask spread wider (10-30bp vs. <1bp for index CDS)",
-                "Basis risk: bond-CDS basis can widen/tighten independently of credit (technical factors)",
-                "Recovery rate mismatch—need to calculate correct hedge ratio",
-                "If bond trades special (repo squeeze), basis hedge breaks down"
-            ],
-            crush_avoidance_rating=7
+            pros=self._BOND_PROS,
+            cons=self._BOND_CONS,
+            **STRATEGY_PROFILES['bond']
         )
     
     def recommend_equity_hedge(self, equity_ticker: str) -> HedgingStrategy:
@@ -145,61 +310,42 @@ class CDSHedgeAnalyzer:
         """
         # Merton hedge ratio: ∂CDS/∂Equity ≈ -0.3 to -0.5 for IG names
         # Negative because equity up -> credit risk down -> CDS spread tightens
-        equity_delta = -0.40
-        equity_notional = self.position_size * abs(equity_delta)
+        equity_notional = self._equity_notional
         
         return HedgingStrategy(
-            name="Equity Cross-Hedge",
             instrument=f"{equity_ticker} Common Stock",
-            direction="Buy",
             notional=equity_notional,
-            rationale=(
-                f"Buy {equity_notional:.0f}M of {equity_ticker} equity to hedge {self.position_size:.0f}M "
-                f"long CDS. Credit risk inversely correlated with equity (Merton model): "
-                f"firm value up -> default risk down -> CDS tightens -> equity hedge gains offset CDS loss."
+            rationale_template=(
+                "Buy {:.0f}M of {} equity to hedge {:.0f}M "
+                "long CDS. Credit risk inversely correlated with equity (Merton model): "
+                "firm value up -> default risk down -> CDS tightens -> equity hedge gains offset CDS loss."
             ),
+            rationale_args=(equity_notional, equity_ticker, self.position_size),
             execution_approach=(
                 "Execute via VWAP algo over 1-2 days (target 10-15% ADV to minimize market impact). "
                 "Use dark pools and smart order routing to avoid information leakage. "
                 "Alternatively, use equity options (buy calls) for levered exposure."
             ),
-            liquidity_score=10,
-            basis_risk="High",
-            market_impact="Low",
-            time_horizon="1-2 weeks",
-            pros=[
-                "ZERO credit market impact—executed in completely separate market (equity exchange)",
-                "Highest liquidity—can trade $100M+ in most large-cap names without issue",
-                "No signal leak to credit traders; maintains confidentiality of CDS position",
-                "Can use options for capital efficiency (buy ATM calls = synthetic long)",
-                "Dynamic delta—equity responds faster than bonds/CDS to news"
-            ],
-            cons=[
-                "High basis risk—correlation not perfect; equity driven by growth, CDS by credit",
-                "Equity volatility >> credit volatility; requires frequent rebalancing",
-                "Idiosyncratic factors: equity can fall while credit improves (e.g., margin compression)",
-                "Merton hedge ratio unstable—changes with leverage, volatility, equity price",
-                "Regulatory capital: equity held in trading book (higher RWA than bonds)"
-            ],
-            crush_avoidance_rating=10
+            pros=self._EQUITY_PROS,
+            cons=self._EQUITY_CONS,
+            **STRATEGY_PROFILES['equity']
         )
     
     def recommend_patient_closeout(self) -> HedgingStrategy:
         """
         Recommend gradual unwinding of CDS position
         """
-        daily_notional = self.position_size / 10  # Spread over 10 days
+        daily_notional = self._daily_unwind
         
         return HedgingStrategy(
-            name="Gradual Unwind (Patient Approach)",
             instrument=f"{self.entity} CDS",
-            direction="Sell Protection",
             notional=daily_notional,
-            rationale=(
-                f"Close {self.position_size:.0f}M long CDS position by selling protection in "
-                f"{daily_notional:.0f}M clips over 10 trading days. Small trade sizes avoid "
-                f"triggering spread tightening; use multiple dealers and platforms for stealth."
+            rationale_template=(
+                "Close {:.0f}M long CDS position by selling protection in "
+                "{:.0f}M clips over 10 trading days. Small trade sizes avoid "
+                "triggering spread tightening; use multiple dealers and platforms for stealth."
             ),
+            rationale_args=(self.position_size, daily_notional),
             execution_approach=(
                 "Day 1-3: Trade 3x clips via Dealer A (D2D voice). "
                 "Day 4-6: Trade 3x clips via Bloomberg SEF (anonymous). "
@@ -207,68 +353,36 @@ class CDSHedgeAnalyzer:
                 "Day 10: Final clip via Tradeweb. "
                 "Keep each trade <15% of estimated daily volume. Use limit orders near mid."
             ),
-            liquidity_score=4,
-            basis_risk="None",
-            market_impact="Low",
-            time_horizon="2-3 weeks",
-            pros=[
-                "Perfect hedge—same instrument, zero basis risk",
-                "Small clips reduce market impact; spreads stay stable",
-                "Dealer rotation and platform diversification prevent information aggregation",
-                "Flexibility to pause if spreads move against you; wait for better levels",
-                "Can use algo tools (VWAP-style for CDS) if available on electronic platforms"
-            ],
-            cons=[
-                "Time risk: position remains open for 2-3 weeks; market can move against you",
-                "Execution risk: need consistent liquidity; illiquid names can't support daily clips",
-                "Transaction costs: 10 trades = 10x bid-ask spread drag (vs. 1 block trade)",
-                "Operational complexity: managing multiple dealers, platforms, settlement",
-                "If market learns you're unwinding (dealer gossip), spread can still tighten"
-            ],
-            crush_avoidance_rating=8
+            pros=self._CLOSEOUT_PROS,
+            cons=self._CLOSEOUT_CONS,
+            **STRATEGY_PROFILES['closeout']
         )
     
     def recommend_options_hedge(self) -> HedgingStrategy:
         """
         Recommend using CDS options (swaptions) for hedging
         """
-        strike = self.current_spread * 0.90  # 10% OTM put
+        strike = self._swaption_strike
         notional = self.position_size
         
         return HedgingStrategy(
-            name="CDS Put Swaption",
             instrument=f"{self.entity} CDS Payer Swaption (Strike {strike:.0f}bp)",
-            direction="Sell",
             notional=notional,
-            rationale=(
-                f"Sell {notional:.0f}M of CDS payer swaptions (strike {strike:.0f}bp, "
-                f"current spread {self.current_spread:.0f}bp) to monetize spread tightening risk. "
-                f"If spreads tighten below strike, swaption expires OTM (you keep premium). "
-                f"Acts as insurance premium collection."
+            rationale_template=(
+                "Sell {:.0f}M of CDS payer swaptions (strike {:.0f}bp, "
+                "current spread {:.0f}bp) to monetize spread tightening risk. "
+                "If spreads tighten below strike, swaption expires OTM (you keep premium). "
+                "Acts as insurance premium collection."
             ),
+            rationale_args=(notional, strike, self.current_spread),
             execution_approach=(
                 "Trade OTC with 2-3 dealers; request competitive quotes. "
                 "Typical premium: 10-30bp upfront for 6M-1Y tenor. "
                 "Consider exotic structures (knock-in, barrier) to reduce premium."
             ),
-            liquidity_score=3,
-            basis_risk="Low",
-            market_impact="Low",
-            time_horizon="Immediate",
-            pros=[
-                "Premium income offsets potential CDS mark-to-market loss",
-                "Non-linear payoff: capped downside if spreads tighten dramatically",
-                "OTC structure allows customization (strike, tenor, notional)",
-                "Smaller notional traded vs. outright CDS hedge (less market impact)"
-            ],
-            cons=[
-                "Illiquid market—only available for large, liquid reference entities",
-                "Wide bid-ask on premium (5-10bp spread); difficult to price",
-                "Upfront cost: premium paid reduces P&L if spreads don't tighten",
-                "Counterparty risk: need ISDA and CSA with dealers",
-                "Complex Greeks: vega, theta require active management"
-            ],
-            crush_avoidance_rating=9
+            pros=self._OPTIONS_PROS,
+            cons=self._OPTIONS_CONS,
+            **STRATEGY_PROFILES['options']
         )
 
 
@@ -277,6 +391,32 @@ class CrossAssetHedger:
     Generates cross-asset hedging strategies based on correlation regimes
     """
     
+    # Pros and cons per recommender, shared by every strategy built
+    _RATES_PROS = (
+        "Deepest market in the world—zero execution risk",
+        "Hedges systematic risk-off scenarios (flight to quality)",
+        "Central clearing reduces counterparty risk",
+        "Can dynamically adjust duration as portfolio changes"
+    )
+    _RATES_CONS = (
+        "Basis risk: correlation breaks down in credit-specific events",
+        "Negative carry in upward-sloping yield curve (pay floating > receive fixed)",
+        "Requires constant rebalancing as rates move",
+        "Doesn't hedge idiosyncratic credit risk"
+    )
+    _FX_PROS = (
+        "Eliminates FX translation risk on credit portfolio",
+        "Highly liquid FX market—instant execution",
+        "Can lock in forward points (carry trade if positive)",
+        "Transparent pricing; tight spreads (1-3 pips for majors)"
+    )
+    _FX_CONS = (
+        "Introduces funding basis risk if using cross-currency swaps",
+        "Forward roll costs if holding long-term",
+        "Doesn't address underlying credit risk—pure FX hedge",
+        "Requires mark-to-market management as FX moves"
+    )
+    
     def __init__(self, credit_exposure: float, macro_scenario: Dict[str, float]):
         self.credit_exposure = credit_exposure
         self.macro_scenario = macro_scenario
@@ -285,41 +425,25 @@ class CrossAssetHedger:
         """
         Hedge credit risk via rates (duration hedge)
         """
-        dv01_credit = self.credit_exposure * 0.05  # Assume 5yr duration
-        rates_notional = dv01_credit * 100  # Convert to notional
+        rates_notional = self.credit_exposure * RATES_HEDGE_RATIO
         
         return HedgingStrategy(
-            name="Interest Rate Hedge (Duration Overlay)",
             instrument="5Y Treasury Futures (ZF) or IRS",
-            direction="Receive Fixed",
             notional=rates_notional,
-            rationale=(
-                f"Credit spreads and risk-free rates negatively correlated during risk-off. "
-                f"If credit deteriorates (spreads widen, our shorts profit), rates fall "
-                f"(duration gains offset). Hedge ratio based on historical beta_credit_rates ~= -0.3."
+            rationale_template=(
+                "Credit spreads and risk-free rates negatively correlated during risk-off. "
+                "If credit deteriorates (spreads widen, our shorts profit), rates fall "
+                "(duration gains offset). Hedge ratio based on historical beta_credit_rates ~= -0.3."
             ),
+            rationale_args=(),
             execution_approach=(
                 "Execute 5Y IRS receive-fixed (pay floating) via cleared swap (LCH, CME). "
                 "Highly liquid: $1B+ trades daily. Alternatively use Treasury futures "
                 "(ZF contract, $100k DV01 per contract)."
             ),
-            liquidity_score=10,
-            basis_risk="Medium",
-            market_impact="Negligible",
-            time_horizon="Immediate",
-            pros=[
-                "Deepest market in the world—zero execution risk",
-                "Hedges systematic risk-off scenarios (flight to quality)",
-                "Central clearing reduces counterparty risk",
-                "Can dynamically adjust duration as portfolio changes"
-            ],
-            cons=[
-                "Basis risk: correlation breaks down in credit-specific events",
-                "Negative carry in upward-sloping yield curve (pay floating > receive fixed)",
-                "Requires constant rebalancing as rates move",
-                "Doesn't hedge idiosyncratic credit risk"
-            ],
-            crush_avoidance_rating=10
+            pros=self._RATES_PROS,
+            cons=self._RATES_CONS,
+            **STRATEGY_PROFILES['rates']
         )
     
     def recommend_fx_hedge(self, foreign_exposure: bool = True) -> HedgingStrategy:
@@ -329,60 +453,29 @@ class CrossAssetHedger:
         if not foreign_exposure:
             return None
         
-        fx_notional = self.credit_exposure * 0.5  # Assume 50% is FX-sensitive
+        fx_notional = self.credit_exposure * FX_HEDGE_RATIO
         
         return HedgingStrategy(
-            name="FX Hedge (Currency Overlay)",
             instrument="USD/AUD or USD/EUR FX Forward",
-            direction="Sell Foreign Currency",
             notional=fx_notional,
-            rationale=(
-                f"Credit denominated in foreign currency creates FX exposure. "
-                f"If foreign currency strengthens, credit losses amplified in USD terms. "
-                f"Hedge via FX forwards or cross-currency swaps."
+            rationale_template=(
+                "Credit denominated in foreign currency creates FX exposure. "
+                "If foreign currency strengthens, credit losses amplified in USD terms. "
+                "Hedge via FX forwards or cross-currency swaps."
             ),
+            rationale_args=(),
             execution_approach=(
                 "Execute FX forward (3M, 6M, 1Y tenor) via EBS, Reuters, or voice broker. "
                 "For larger notionals ($50M+), use cross-currency basis swap to also hedge funding."
             ),
-            liquidity_score=9,
-            basis_risk="Low",
-            market_impact="Negligible",
-            time_horizon="Immediate",
-            pros=[
-                "Eliminates FX translation risk on credit portfolio",
-                "Highly liquid FX market—instant execution",
-                "Can lock in forward points (carry trade if positive)",
-                "Transparent pricing; tight spreads (1-3 pips for majors)"
-            ],
-            cons=[
-                "Introduces funding basis risk if using cross-currency swaps",
-                "Forward roll costs if holding long-term",
-                "Doesn't address underlying credit risk—pure FX hedge",
-                "Requires mark-to-market management as FX moves"
-            ],
-            crush_avoidance_rating=10
+            pros=self._FX_PROS,
+            cons=self._FX_CONS,
+            **STRATEGY_PROFILES['fx']
         )
 
 
-def generate_hedging_recommendations(
-    position: Dict[str, Any],
-    scenario: str,
-    market_conditions: Dict[str, float]
-) -> List[HedgingStrategy]:
-    """
-    Generate comprehensive hedging recommendations based on position and scenario
-    
-    Args:
-        position: Dict with 'type', 'notional', 'entity', 'spread', etc.
-        scenario: Scenario name (e.g., "Tightening", "Soft Landing")
-        market_conditions: Dict with 'liquidity_score', 'volatility', etc.
-    
-    Returns:
-        List of HedgingStrategy objects, ranked by appropriateness
-    """
-    recommendations = []
-    
+def _iter_strategies(position: Dict[str, Any], market_conditions: Dict[str, float]):
+    """Yield the hedging strategies that apply to a position, in recommender order"""
     if position['type'] == 'long_cds':
         analyzer = CDSHedgeAnalyzer(
             position_size=position['notional'],
@@ -391,24 +484,22 @@ def generate_hedging_recommendations(
         )
         
         # Always recommend index hedge (most appropriate)
-        recommendations.append(analyzer.recommend_index_hedge())
+        yield analyzer.recommend_index_hedge()
         
         # Add bond hedge if entity has tradable bonds
         if position.get('bond_available', True):
-            bond_hedge = analyzer.recommend_bond_hedge(bond_available=True)
-            if bond_hedge:
-                recommendations.append(bond_hedge)
+            yield analyzer.recommend_bond_hedge(bond_available=True)
         
         # Add equity hedge if entity is public
         if position.get('equity_ticker'):
-            recommendations.append(analyzer.recommend_equity_hedge(position['equity_ticker']))
+            yield analyzer.recommend_equity_hedge(position['equity_ticker'])
         
         # Add patient closeout
-        recommendations.append(analyzer.recommend_patient_closeout())
+        yield analyzer.recommend_patient_closeout()
         
         # Add options if available
         if market_conditions.get('options_market', False):
-            recommendations.append(analyzer.recommend_options_hedge())
+            yield analyzer.recommend_options_hedge()
     
     # Cross-asset hedges
     cross_hedger = CrossAssetHedger(
@@ -416,20 +507,136 @@ def generate_hedging_recommendations(
         macro_scenario=market_conditions
     )
     
-    recommendations.append(cross_hedger.recommend_rates_hedge())
+    yield cross_hedger.recommend_rates_hedge()
     
     if position.get('foreign_currency', False):
-        fx_hedge = cross_hedger.recommend_fx_hedge(foreign_exposure=True)
-        if fx_hedge:
-            recommendations.append(fx_hedge)
-    
-    # Rank by appropriateness (liquidity + crush avoidance)
-    recommendations.sort(
-        key=lambda x: (x.liquidity_score + x.crush_avoidance_rating) / 2,
-        reverse=True
-    )
+        yield cross_hedger.recommend_fx_hedge(foreign_exposure=True)
+
+
+def generate_hedging_recommendations(
+    position: Dict[str, Any],
+    scenario: str,
+    market_conditions: Dict[str, float],
+    top_k: Optional[int] = None
+) -> List[HedgingStrategy]:
+    """
+    Generate comprehensive hedging recommendations based on position and scenario
+    
+    Args:
+        position: Dict with 'type', 'notional', 'entity', 'spread', etc.
+        scenario: Scenario name (e.g., "Tightening", "Soft Landing")
+        market_conditions: Dict with 'liquidity_score', 'volatility', etc.
+        top_k: Optional number of best-ranked strategies to return
+    
+    Returns:
+        List of HedgingStrategy objects, ranked by appropriateness
+    """
+    # Rank by appropriateness (liquidity + crush avoidance; the sum orders
+    # the same as the average, without the float division)
+    def score(x):
+        return x.liquidity_score + x.crush_avoidance_rating
     
-    return recommendations
+    strategies = _iter_strategies(position, market_conditions)
+    if top_k is not None:
+        # Partial selection; stable like the full sort
+        return heapq.nlargest(top_k, strategies, key=score)
+    return sorted(strategies, key=score, reverse=True)
+
+
+def generate_hedging_recommendations_batch(
+    positions: pd.DataFrame,
+    scenario: str,
+    market_conditions: Dict[str, float]
+) -> pd.DataFrame:
+    """
+    Batch generate_hedging_recommendations over a frame of positions
+    
+    Each strategy is sized for every eligible position with column
+    operations, so no analyzer or HedgingStrategy objects are built
+    
+    Args:
+        positions: One row per position, with the keys the scalar version
+                   reads from its position dict as columns
+        scenario: Scenario name (e.g., "Tightening", "Soft Landing")
+        market_conditions: Dict with 'liquidity_score', 'volatility', etc.
+    
+    Returns:
+        Long-form DataFrame with one row per (position, strategy), ranked
+        within each position as generate_hedging_recommendations does
+    """
+    n = len(positions)
+    notional = positions['notional'].to_numpy(np.float64)
+    is_cds = positions['type'].eq('long_cds').to_numpy()
+    
+    def flag(column, default):
+        if column not in positions:
+            return np.full(n, default)
+        return positions[column].fillna(default).astype(bool).to_numpy()
+    
+    if is_cds.any():
+        entity = positions['entity'].astype(str)
+        is_us = (entity.str.contains("US", regex=False)
+                 | entity.str.contains("North America", regex=False)).to_numpy()
+        index = np.where(is_us, "CDX.NA.IG", "iTraxx Europe")
+        entity = entity.to_numpy()
+        tickers = positions.get('equity_ticker', pd.Series(None, index=positions.index))
+        has_equity = tickers.fillna('').astype(str).ne('').to_numpy()
+        tickers = tickers.astype(str).to_numpy()
+        strike = positions['spread'].to_numpy(np.float64) * SWAPTION_STRIKE_RATIO
+    else:
+        has_equity = np.zeros(n, dtype=bool)
+        index = entity = tickers = np.full(n, '')
+        strike = np.zeros(n)
+    
+    blocks = []
+    
+    def add(mask, profile, instrument, size):
+        rows = np.flatnonzero(mask)
+        if rows.size:
+            profile = STRATEGY_PROFILES[profile]
+            blocks.append(pd.DataFrame({
+                '_row': rows,
+                'name': profile['name'],
+                'instrument': instrument[rows] if isinstance(instrument, np.ndarray) else instrument,
+                'direction': profile['direction'],
+                'notional': size[rows],
+                'liquidity_score': profile['liquidity_score'],
+                'basis_risk': profile['basis_risk'],
+                'market_impact': profile['market_impact'],
+                'time_horizon': profile['time_horizon'],
+                'crush_avoidance_rating': profile['crush_avoidance_rating']
+            }))
+    
+    # Same strategies, sizes and order as CDSHedgeAnalyzer / CrossAssetHedger
+    add(is_cds, 'index', np.char.add(index.astype(str), " Index CDS"), notional * INDEX_HEDGE_RATIO)
+    add(is_cds & flag('bond_available', True), 'bond',
+        np.char.add(entity.astype(str), " Senior Unsecured Bond"), notional * BOND_HEDGE_RATIO)
+    add(is_cds & has_equity, 'equity', np.char.add(tickers.astype(str), " Common Stock"),
+        notional * EQUITY_HEDGE_RATIO)
+    add(is_cds, 'closeout', np.char.add(entity.astype(str), " CDS"), notional / UNWIND_DAYS)
+    if market_conditions.get('options_market', False):
+        swaption = np.array([
+            f"{e} CDS Payer Swaption (Strike {k:.0f}bp)" if cds else ''
+            for e, k, cds in zip(entity, strike, is_cds)
+        ], dtype=object)
+        add(is_cds, 'options', swaption, notional)
+    add(np.ones(n, dtype=bool), 'rates', "5Y Treasury Futures (ZF) or IRS", notional * RATES_HEDGE_RATIO)
+    add(flag('foreign_currency', False), 'fx', "USD/AUD or USD/EUR FX Forward", notional * FX_HEDGE_RATIO)
+    
+    if not blocks:
+        return pd.DataFrame()
+    
+    result = pd.concat(blocks, ignore_index=True)
+    
+    # Rank within each position; lexsort is stable, so ties keep strategy order
+    score = (result['liquidity_score'] + result['crush_avoidance_rating']).to_numpy()
+    result = result.iloc[np.lexsort((-score, result['_row'].to_numpy()))]
+    result.insert(0, 'position', positions.index[result['_row'].to_numpy()])
+    
+    # Few distinct values per field, so store them as integer-coded categories
+    result = result.astype(STRATEGY_CATEGORIES)
+    
+    return result.drop(columns='_row').reset_index(drop=True)
 
 
 def calculate_hedge_ratio(position_spread: float, hedge_spread: float, correlation: float = 0.85) -> float:
@@ -443,7 +650,8 @@ def calculate_hedge_ratio(position_spread: float, hedge_spread: float, correlati
     spread_ratio = position_spread / hedge_spread if hedge_spread > 0 else 1.0
     hedge_ratio = correlation * spread_ratio
     
-    return np.clip(hedge_ratio, 0.5, 1.5)  # Reasonable bounds
+    # Reasonable bounds (scalar clip; np.clip would go through ufunc dispatch)
+    return 0.5 if hedge_ratio < 0.5 else 1.5 if hedge_ratio > 1.5 else hedge_ratio
 
 
 def estimate_basis_risk(hedge_type: str, scenario: str) -> Dict[str, float]:
@@ -451,27 +659,69 @@ def estimate_basis_risk(hedge_type: str, scenario: str) -> Dict[str, float]:
     Estimate basis risk for different hedge types
     
     Returns:
-        Dict with 'expected_tracking_error', 'worst_case_loss', 'r_squared'
+        Dict with 'tracking_error', 'worst_case', 'r_squared'
     """
-    basis_risk_matrix = {
-        'index_cds': {
-            'Tightening': {'tracking_error': 0.15, 'worst_case': 0.25, 'r_squared': 0.75},
-            'Soft Landing': {'tracking_error': 0.10, 'worst_case': 0.18, 'r_squared': 0.82},
-            'Funding Shock': {'tracking_error': 0.20, 'worst_case': 0.35, 'r_squared': 0.65}
-        },
-        'corporate_bond': {
-            'Tightening': {'tracking_error': 0.08, 'worst_case': 0.15, 'r_squared': 0.90},
-            'Soft Landing': {'tracking_error': 0.05, 'worst_case': 0.10, 'r_squared': 0.93},
-            'Funding Shock': {'tracking_error': 0.25, 'worst_case': 0.45, 'r_squared': 0.55}
-        },
-        'equity': {
-            'Tightening': {'tracking_error': 0.35, 'worst_case': 0.60, 'r_squared': 0.45},
-            'Soft Landing': {'tracking_error': 0.25, 'worst_case': 0.40, 'r_squared': 0.60},
-            'Funding Shock': {'tracking_error': 0.50, 'worst_case': 0.80, 'r_squared': 0.30}
-        }
-    }
+    # Copied out of the shared read-only table so callers get a plain dict
+    return dict(BASIS_RISK_TABLE.get((hedge_type, scenario), DEFAULT_BASIS_RISK))
+
+
+def _hedge_ratio_kernel(position_spreads, hedge_spreads, correlation, out):
+    """
+    Divide, scale and clip each hedge ratio into out in one fused pass
+    """
+    for i in prange(position_spreads.size):
+        ratio = position_spreads[i] / hedge_spreads[i] if hedge_spreads[i] > 0 else 1.0
+        value = correlation * ratio
+        out[i] = 0.5 if value < 0.5 else 1.5 if value > 1.5 else value
+    return out
+
+
+if njit is not None:
+    # No fastmath: its no-NaN assumption would clip NaN ratios to 0.5,
+    # unlike np.clip and calculate_hedge_ratio
+    _hedge_ratio_kernel = njit(parallel=True, cache=True)(_hedge_ratio_kernel)
+
+
+def calculate_hedge_ratios(position_spreads, hedge_spreads, correlation=0.85) -> np.ndarray:
+    """
+    Vectorised calculate_hedge_ratio over arrays of spreads
+    
+    correlation may be a scalar or an array matching the spreads
+    """
+    position_spreads, hedge_spreads = np.broadcast_arrays(
+        np.asarray(position_spreads, dtype=np.float64),
+        np.asarray(hedge_spreads, dtype=np.float64)
+    )
+    
+    if njit is not None and np.ndim(correlation) == 0:
+        out = np.empty(position_spreads.shape)
+        _hedge_ratio_kernel(
+            np.ascontiguousarray(position_spreads).ravel(),
+            np.ascontiguousarray(hedge_spreads).ravel(),
+            float(correlation), out.reshape(-1)
+        )
+        return out
     
-    return basis_risk_matrix.get(hedge_type, {}).get(scenario, {'tracking_error': 0.20, 'worst_case': 0.40, 'r_squared': 0.70})
+    ratio = np.divide(
+        position_spreads, hedge_spreads,
+        out=np.ones(position_spreads.shape), where=hedge_spreads > 0
+    )
+    np.multiply(correlation, ratio, out=ratio)
+    return np.clip(ratio, 0.5, 1.5, out=ratio)
+
+
+def estimate_basis_risk_df(hedge_types, scenarios) -> pd.DataFrame:
+    """
+    Vectorised estimate_basis_risk over paired hedge types and scenarios
+    
+    Returns:
+        DataFrame with 'tracking_error', 'worst_case', 'r_squared' per pair,
+        indexed like hedge_types when it is a Series
+    """
+    pairs = pd.MultiIndex.from_arrays([hedge_types, scenarios])
+    result = BASIS_RISK_FRAME.reindex(pairs).fillna(dict(DEFAULT_BASIS_RISK))
+    result.index = hedge_types.index if isinstance(hedge_types, pd.Series) else pd.RangeIndex(len(pairs))
+    return result
 
 
 if __name__ == "__main__":
@@ -4,7 +4,9 @@ Run this after installation to check your setup
 """
 import sys
 import os
+import traceback
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -21,24 +23,81 @@ print("\n" + "="*70)
 print("CAPITAL FLOW & CREDIT RISK MODEL - SYSTEM TEST")
 print("="*70)
 
-# Test 1: Data Ingestion
-print("\n[1/5] Testing Data Ingestion...")
-try:
+
+def load_au_data():
     from src.ingest_au import get_au_data
+    return get_au_data()
+
+
+def load_us_data():
     from src.ingest_us import get_us_data
+    return get_us_data()
+
+
+def build_portfolios():
+    from src.modeling.portfolio import (
+        create_example_au_portfolio,
+        create_example_us_portfolio
+    )
     
-    df_au = get_au_data()
-    df_us = get_us_data()
+    portfolio_au = create_example_au_portfolio()
+    portfolio_us = create_example_us_portfolio()
+    
+    portfolio_au.calculate_ecl()
+    portfolio_au.calculate_rwa()
+    capital_au = portfolio_au.calculate_capital()
+    
+    portfolio_us.calculate_ecl()
+    portfolio_us.calculate_rwa()
+    capital_us = portfolio_us.calculate_capital()
+    
+    return portfolio_au, portfolio_us, capital_au, capital_us
+
+
+# Import the shared dependencies on the main thread first: importing pandas
+# from several threads at once can hand one of them a partially initialized
+# module. An import failure here resurfaces in the stage that needs it
+try:
+    import numpy
+    import pandas
+    import src.ingest_au
+    import src.ingest_us
+    import src.modeling.portfolio
+except ImportError:
+    pass
+
+# Data loading and portfolio setup don't depend on each other, so start them
+# together; each stage below reports in order
+executor = ThreadPoolExecutor(max_workers=3)
+au_future = executor.submit(load_au_data)
+us_future = executor.submit(load_us_data)
+portfolio_future = executor.submit(build_portfolios)
+
+
+def _run_stage(title, stage, *args):
+    """Print the stage header and run it, exiting on the first failure"""
+    print(f"\n{title}")
+    try:
+        return stage(*args)
+    except Exception as e:
+        print(f"  [ERROR] Error: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+def stage_data_ingestion():
+    """Data Ingestion"""
+    df_au = au_future.result()
+    df_us = us_future.result()
     
     print(f"  [OK] AU data: {len(df_au)} months, {len(df_au.columns)} columns")
     print(f"  [OK] US data: {len(df_us)} months, {len(df_us.columns)} columns")
-except Exception as e:
-    print(f"  [ERROR] Error: {e}")
-    sys.exit(1)
+    
+    return df_au, df_us
 
-# Test 2: Core Modeling
-print("\n[2/5] Testing Core Credit Risk Models...")
-try:
+
+def stage_core_models(df_au):
+    """Core Modeling"""
     from src.modeling.core import (
         CreditAvailabilityIndex, PDModel, LGDModel, 
         EADModel, ECLCalculator
@@ -64,30 +123,43 @@ try:
     print(f"  [OK] PD range: {df_au['pd'].min():.2%} - {df_au['pd'].max():.2%}")
     print(f"  [OK] LGD range: {df_au['lgd'].min():.2%} - {df_au['lgd'].max():.2%}")
     print(f"  [OK] ECL for $100k exposure: ${ecl:.2f}")
-except Exception as e:
-    print(f"  [ERROR] Error: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-
-# Test 3: Portfolio Models
-print("\n[3/5] Testing Portfolio Analytics...")
-try:
-    from src.modeling.portfolio import (
-        create_example_au_portfolio,
-        create_example_us_portfolio
-    )
     
-    portfolio_au = create_example_au_portfolio()
-    portfolio_us = create_example_us_portfolio()
+    # Closed-form lifetime ECL matches the per-year discounted sum
+    for maturity in (1, 5, 10, 30):
+        expected = sum(0.05 / maturity * 0.4 * 100000 / 1.05 ** t for t in range(1, maturity + 1))
+        lifetime = ecl_calc.calculate_lifetime_ecl(0.05, 0.4, 100000, maturity=maturity)
+        assert abs(lifetime / expected - 1) < 1e-12, (maturity, lifetime, expected)
+    assert ecl_calc.calculate_lifetime_ecl(0.05, 0.4, 100000, maturity=0) == 0
     
-    portfolio_au.calculate_ecl()
-    portfolio_au.calculate_rwa()
-    capital_au = portfolio_au.calculate_capital()
+    print(f"  [OK] Lifetime ECL matches discounted sum for maturities 1, 5, 10, 30")
     
-    portfolio_us.calculate_ecl()
-    portfolio_us.calculate_rwa()
-    capital_us = portfolio_us.calculate_capital()
+    # Single-precision RWA/ECL stays within 1e-5 relative of double and
+    # keeps Series indexes
+    import numpy as np
+    import pandas as pd
+    from src.modeling.core import calculate_rwa_simple
+    
+    fixture_rng = np.random.default_rng(0)
+    index = pd.Index([f"seg_{i}" for i in range(1000)])
+    pd_values = pd.Series(fixture_rng.uniform(0.005, 0.2, 1000), index=index)
+    lgd_values = pd.Series(fixture_rng.uniform(0.1, 0.6, 1000), index=index)
+    ead_values = pd.Series(fixture_rng.uniform(1e4, 1e7, 1000), index=index)
+    
+    for calculate in (
+        lambda dtype: calculate_rwa_simple(ead_values, pd_values, lgd_values, dtype=dtype),
+        lambda dtype: ecl_calc.calculate_12m_ecl(pd_values, lgd_values, ead_values, dtype=dtype)
+    ):
+        single, double = calculate(np.float32), calculate(np.float64)
+        assert isinstance(single, pd.Series) and single.index.equals(index)
+        rel_error = np.max(np.abs(single.to_numpy(np.float64) / double.to_numpy() - 1))
+        assert rel_error < 1e-5, rel_error
+    
+    print(f"  [OK] float32 RWA/ECL within 1e-5 relative of float64")
+
+
+def stage_portfolios():
+    """Portfolio Models"""
+    portfolio_au, portfolio_us, capital_au, capital_us = portfolio_future.result()
     
     print(f"  [OK] AU Portfolio - {len(portfolio_au.exposures)} segments")
     print(f"    Total EAD: ${portfolio_au.exposures['total_ead'].sum()/1e9:.1f}B")
@@ -100,20 +172,28 @@ try:
     print(f"    Total ECL: ${portfolio_us.exposures['ecl_12m'].sum()/1e6:.1f}M")
     print(f"    Total RWA: ${portfolio_us.exposures['rwa'].sum()/1e9:.1f}B")
     print(f"    CET1 Required: ${capital_us['cet1_required']/1e9:.2f}B")
-except Exception as e:
-    print(f"  [ERROR] Error: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
+    
+    # Cached ECL/RWA columns must follow edits to their inputs
+    from src.modeling.portfolio import create_example_au_portfolio
+    edited = create_example_au_portfolio()
+    ecl_before = edited.calculate_ecl()['ecl_12m'].sum()
+    rwa_before = edited.calculate_rwa()['rwa'].sum()
+    edited.exposures['avg_pd'] *= 2
+    assert edited.calculate_ecl()['ecl_12m'].sum() > ecl_before, "ECL not recalculated after PD edit"
+    assert edited.calculate_rwa()['rwa'].sum() > rwa_before, "RWA not recalculated after PD edit"
+    print("  [OK] ECL/RWA recalculated after exposure edits")
+    
+    return portfolio_au, portfolio_us
 
-# Test 4: Stress Scenarios
-print("\n[4/5] Testing Stress Scenarios...")
-try:
+
+def stage_stress_scenarios(portfolio_au, df_au):
+    """Stress Scenarios"""
     from src.stress.scenarios import (
         TighteningScenario, SoftLandingScenario,
-        FundingShockScenario, SevereRecessionScenario,
+        FundingShockScenario, SevereRecessionScenario, StressScenario,
         apply_scenario_to_portfolio
     )
+    import numpy as np
     
     tightening = TighteningScenario()
     soft_landing = SoftLandingScenario()
@@ -137,14 +217,114 @@ try:
     print(f"    Baseline ECL: ${baseline_ecl/1e6:.1f}M")
     print(f"    Stressed ECL: ${stressed_ecl/1e6:.1f}M")
     print(f"    Increase: +{increase_pct:.1f}%")
-except Exception as e:
-    print(f"  [ERROR] Error: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
+    
+    # The only_latest tail must match the full horizon, and is skipped for
+    # scenarios that do not opt in as path-independent
+    class CumulativeScenario(StressScenario):
+        def apply(self, df_base):
+            df_stressed = df_base.copy()
+            df_stressed['unemployment_rate'] = df_stressed['unemployment_rate'] + np.arange(len(df_base)) * 0.1
+            return df_stressed
+    
+    for scenario in scenarios + [CumulativeScenario("Cumulative", "Path-dependent drift")]:
+        full, _ = apply_scenario_to_portfolio(portfolio_au, scenario, df_au)
+        tail, _ = apply_scenario_to_portfolio(portfolio_au, scenario, df_au, only_latest=True)
+        assert np.allclose(full['ecl_stressed'], tail['ecl_stressed']), scenario.name
+    print("  [OK] only_latest matches the full horizon")
+
+
+def stage_hedging():
+    """Hedging Strategies"""
+    import copy
+    import pickle
+    from src.trading.hedging import generate_hedging_recommendations
+    
+    position = {
+        'type': 'long_cds', 'notional': 100, 'entity': 'XYZ Corp (US)', 'spread': 150,
+        'equity_ticker': 'XYZ', 'foreign_currency': True
+    }
+    strategies = generate_hedging_recommendations(position, "Tightening", {'options_market': True})
+    
+    # Frozen slotted strategies must survive pickling and copying
+    for strategy in strategies:
+        for clone in (pickle.loads(pickle.dumps(strategy)), copy.copy(strategy), copy.deepcopy(strategy)):
+            assert clone == strategy and clone.rationale == strategy.rationale
+    
+    # An explicit rationale= is kept as given, and asdict() carries the text either way
+    import dataclasses
+    from src.trading.hedging import HedgingStrategy
+    
+    explicit = dataclasses.replace(strategies[0], rationale="Hand-written rationale")
+    assert explicit.rationale == "Hand-written rationale"
+    assert dataclasses.asdict(strategies[0])['rationale'] == strategies[0].rationale
+    assert HedgingStrategy(**dataclasses.asdict(strategies[0])) == strategies[0]
+    
+    print(f"  [OK] {len(strategies)} strategies, pickle/copy round-trip intact")
+    
+    # Batch rows match the scalar recommendations field by field
+    import pandas as pd
+    from src.trading.hedging import generate_hedging_recommendations_batch
+    
+    positions = [
+        position,
+        {'type': 'long_cds', 'notional': 40, 'entity': 'ABC SA (Europe)', 'spread': 220,
+         'bond_available': False},
+        {'type': 'loan_book', 'notional': 250, 'foreign_currency': True},
+        {'type': 'long_cds', 'notional': 75, 'entity': 'North America Rail', 'spread': 90,
+         'equity_ticker': 'NAR'}
+    ]
+    fields = ['name', 'instrument', 'direction', 'notional', 'liquidity_score', 'basis_risk',
+              'market_impact', 'time_horizon', 'crush_avoidance_rating']
+    for conditions in ({'options_market': True}, {}):
+        batch = generate_hedging_recommendations_batch(pd.DataFrame(positions), "Tightening", conditions)
+        for i, single in enumerate(positions):
+            rows = batch[batch['position'] == i]
+            expected = generate_hedging_recommendations(single, "Tightening", conditions)
+            assert len(rows) == len(expected), f"position {i}: {len(rows)} vs {len(expected)} strategies"
+            for row, strategy in zip(rows.itertuples(), expected):
+                for field in fields:
+                    assert getattr(row, field) == getattr(strategy, field), (i, strategy.name, field)
+    
+    print(f"  [OK] Batch recommendations match scalar for mixed positions")
+    
+    # Batch hedge ratios agree with the scalar version on NaN, zero and
+    # negative spreads, whichever path (numba kernel or NumPy) runs
+    import numpy as np
+    from src.trading.hedging import calculate_hedge_ratio, calculate_hedge_ratios
+    
+    position_spreads = np.array([np.nan, 150.0, 150.0, 150.0, 100.0, 300.0])
+    hedge_spreads = np.array([100.0, 0.0, -50.0, np.nan, 400.0, 100.0])
+    expected = [calculate_hedge_ratio(p, h) for p, h in zip(position_spreads, hedge_spreads)]
+    np.testing.assert_array_equal(calculate_hedge_ratios(position_spreads, hedge_spreads), expected)
+    np.testing.assert_array_equal(
+        calculate_hedge_ratios(position_spreads, hedge_spreads, np.full(len(hedge_spreads), 0.85)),
+        expected
+    )
+    
+    print(f"  [OK] Batch hedge ratios match scalar on NaN/zero/negative spreads")
+    
+    # Basis risk estimates are plain dicts, safe to serialise and edit
+    import json
+    from src.trading.hedging import estimate_basis_risk
+    
+    basis = estimate_basis_risk('equity', 'Tightening')
+    json.dumps(basis)
+    pickle.loads(pickle.dumps(basis))
+    basis['r_squared'] = 0.0
+    assert estimate_basis_risk('equity', 'Tightening')['r_squared'] == 0.45
+    
+    print(f"  [OK] Basis risk estimates serialise as plain dicts")
+
+
+# Tests 1-5: each failure is fatal
+df_au, df_us = _run_stage("[1/6] Testing Data Ingestion...", stage_data_ingestion)
+_run_stage("[2/6] Testing Core Credit Risk Models...", stage_core_models, df_au)
+portfolio_au, portfolio_us = _run_stage("[3/6] Testing Portfolio Analytics...", stage_portfolios)
+_run_stage("[4/6] Testing Stress Scenarios...", stage_stress_scenarios, portfolio_au, df_au)
+_run_stage("[5/6] Testing Hedging Strategies...", stage_hedging)
 
-# Test 5: Import Dashboard (don't run, just verify imports)
-print("\n[5/5] Testing Dashboard Imports...")
+# Test 6: Import Dashboard (don't run, just verify imports)
+print("\n[6/6] Testing Dashboard Imports...")
 try:
     # Try importing streamlit modules used in dashboard
     import streamlit
@@ -156,6 +336,9 @@ try:
 except Exception as e:
     print(f"  [ERROR] Error: {e}")
     print(f"  Note: Run 'pip install streamlit plotly' if needed")
+    sys.exit(1)
+
+executor.shutdown()
 
 # Summary
 print("\n" + "="*70)